@@ -1,21 +1,34 @@
+import asyncio
 import discord
 from discord.ext import commands, tasks
 import logging
+from typing import Optional
 from services.user_service import UserService
 from services.leetify_service import LeetifyService
 from services.match_tracker_service import MatchTrackerService
+from services.match_history_service import MatchHistoryService
 from services.config_service import ConfigService
 from services.stats_service import StatsService
+from services.columnar_stats_service import ColumnarStatsService
+from services.rolling_stats_service import RollingStatsService
+from services.synergy_service import SynergyService
 from services.embed_service import EmbedService
+from services.rate_limit_service import Priority
+from services.prefetch_service import PrefetchService
+from services.poller_service import PollerService
+from services.shard_service import ShardService
+from services.outbox_service import OutboxService
 
 logger = logging.getLogger(__name__)
 
 # View class para navegação do leaderboard
 class LeaderboardView(discord.ui.View):
-    def __init__(self, user_stats, author):
+    def __init__(self, user_stats, author, stale_age=None, period="últimas 10 partidas"):
         super().__init__(timeout=180)
         self.user_stats = user_stats
         self.author = author
+        self.period = period
+        self.stale_age = stale_age
         self.current_page = 0
         self.total_pages = (len(user_stats) + 4) // 5  # 5 usuários por página
         self.update_buttons()
@@ -32,7 +45,7 @@ class LeaderboardView(discord.ui.View):
 
         embed = discord.Embed(
             title="🏆 Leaderboard CS2",
-            description=f"Ranking baseado em K/D médio (últimas 10 partidas)\nPágina {page + 1}/{self.total_pages}",
+            description=f"Ranking baseado em K/D médio ({self.period})\nPágina {page + 1}/{self.total_pages}",
             color=0xFFD700
         )
 
@@ -48,7 +61,7 @@ class LeaderboardView(discord.ui.View):
                 inline=False
             )
 
-        return embed
+        return EmbedService.add_stale_marker(embed, self.stale_age)
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         # Apenas o autor do comando pode usar os botões
@@ -76,12 +89,21 @@ class CS2Commands(commands.Cog):
     Cog responsável pelos comandos de tracking de CS2.
     '''
 
+
     def __init__(self, bot):
         self.bot = bot
         self.check_new_matches.start()  # Inicia o background task
 
+    async def cog_load(self):
+        # Carrega o histórico fora do event loop antes do primeiro comando
+        history = await asyncio.to_thread(MatchHistoryService.stats)
+        logger.info(f"Histórico carregado: {history['matches']} partidas, {history['players']} jogadores")
+
     def cog_unload(self):
         self.check_new_matches.cancel()
+        PrefetchService.stop()
+        OutboxService.stop()
+        MatchTrackerService.flush()
 
     @commands.command(name="cadastro", help="Vincula um Steam ID ao usuário do Discord.")
     async def cadastro(self, ctx, usuario: discord.User, steam_id: str):
@@ -100,8 +122,27 @@ class CS2Commands(commands.Cog):
         embed.add_field(name="Steam ID", value=f"`{steam_id}`", inline=False)
         await ctx.send(embed=embed)
 
-    @commands.command(name="performance", help="Mostra dados de performance recentes.")
-    async def performance(self, ctx, usuario: discord.User = None):
+    async def _get_history(self, steam_id: str, limit: Optional[int] = None, since: Optional[float] = None) -> list:
+        '''
+        Lê as partidas do jogador do histórico local.
+
+        Jogadores ainda sem histórico têm a lista recente buscada uma vez na API,
+        o que também alimenta o histórico.
+        '''
+        if not MatchHistoryService.has_player(steam_id):
+            await LeetifyService.get_recent_matches(steam_id)
+        return MatchHistoryService.get_player_matches(steam_id, limit=limit, since=since)
+
+    async def _get_rolling_stats(self, steam_id: str, window: str) -> Optional[dict]:
+        '''
+        Lê os agregados pré-calculados do jogador (RollingStatsService).
+        '''
+        if not MatchHistoryService.has_player(steam_id):
+            await LeetifyService.get_recent_matches(steam_id)
+        return RollingStatsService.get_stats(steam_id, window)
+
+    @commands.command(name="performance", help="Mostra dados de performance (janela: N, hoje, semana, mes ou tudo).")
+    async def performance(self, ctx, usuario: Optional[discord.User] = None, janela: str = None):
         target_user = usuario or ctx.author
         steam_id = UserService.get_steam_id(str(target_user.id))
 
@@ -109,50 +150,53 @@ class CS2Commands(commands.Cog):
             await ctx.send(embed=EmbedService.create_error_embed(f"{target_user.mention} não possui Steam ID vinculado."))
             return
 
-        matches = LeetifyService.get_recent_matches(steam_id)
-        if not matches:
-            await ctx.send(embed=EmbedService.create_error_embed(f"Nenhuma partida recente encontrada para {target_user.mention}."))
+        try:
+            limit, since, period = MatchHistoryService.parse_window(janela)
+        except ValueError:
+            await ctx.send(embed=EmbedService.create_error_embed("Janela inválida. Use um número, `hoje`, `semana`, `mes` ou `tudo`."))
             return
 
-        # Calcular stats
-        stats = StatsService.calculate_average_stats(matches[:10], steam_id)
-        
+        window = RollingStatsService.window_name(janela)
+        if window:
+            # Janelas fixas já vêm agregadas conforme as partidas chegam
+            stats = await self._get_rolling_stats(steam_id, window)
+        else:
+            matches = await self._get_history(steam_id, limit, since)
+            if not matches:
+                await ctx.send(embed=EmbedService.create_error_embed(f"Nenhuma partida encontrada para {target_user.mention} ({period})."))
+                return
+
+            # Calcular stats
+            stats = StatsService.calculate_average_stats(matches, steam_id)
+
         if not stats:
             await ctx.send(embed=EmbedService.create_error_embed(f"Sem dados suficientes para {target_user.mention}."))
             return
 
-        embed = EmbedService.create_performance_embed(target_user, stats)
+        embed = EmbedService.create_performance_embed(target_user, stats, period)
+        EmbedService.add_stale_marker(embed, LeetifyService.stale_data_age())
         await ctx.send(embed=embed)
 
     @commands.command(name="kd", help="Mostra stats principais recentes (K/D, HS%, Rating, Win Rate%).")
-    async def kd(self, ctx, usuario: discord.User = None):
+    async def kd(self, ctx, usuario: Optional[discord.User] = None, janela: str = None):
         # Reutiliza a mesma lógica de performance, pois os dados são os mesmos, apenas a flag/uso poderia mudar se quiséssemos algo mais simples
         # Mas como o pedido foi expandir o KD para mostrar tudo, ele virou um alias funcional do performance praticamente.
         # Vamos manter separado caso a apresentação mude no futuro.
-        await self.performance(ctx, usuario)
+        await self.performance(ctx, usuario, janela)
 
     @commands.command(name="partida", help="Mostra análise detalhada de uma partida.")
     async def partida(self, ctx, match_id: str):
-        match = LeetifyService.get_match_details(match_id)
+        match = await LeetifyService.get_match_details(match_id)
         if not match or 'stats' not in match:
             await ctx.send(embed=EmbedService.create_error_embed("Partida não encontrada."))
             return
 
-        # Carregar usuários para mapear IDs
-        import json
-        import os
-        steam_to_discord = {}
-        if os.path.exists('data/users.json'):
-            with open('data/users.json', 'r') as f:
-                users_data = json.load(f)
-                steam_to_discord = {v: k for k, v in users_data.items()}
-
         registered_players_data = []
-        for stat in match.get('stats', []):
-            steam_id = stat['steam64_id']
-            if steam_id in steam_to_discord:
+        for steam_id, stat in StatsService.match_players(match).items():
+            discord_id = UserService.get_discord_id(steam_id)
+            if discord_id:
                 try:
-                    d_user = await self.bot.fetch_user(int(steam_to_discord[steam_id]))
+                    d_user = await self.bot.fetch_user(int(discord_id))
                     display_name = d_user.mention
                 except:
                     display_name = stat.get('name', 'Unknown')
@@ -176,9 +220,36 @@ class CS2Commands(commands.Cog):
         embed = EmbedService.create_match_embed(match, registered_players_data, match.get('has_banned_player', False))
         await ctx.send(embed=embed)
 
-    @commands.command(name="squad", help="Mostra com quem você mais joga.")
+    @commands.command(name="squad", help="Mostra as melhores e piores duplas e o ranking de duplas do servidor.")
     async def squad(self, ctx, usuario: discord.User = None):
-        await self.perfil(ctx, usuario) # Squad agora faz parte do perfil na nova arquitetura, ou podemos manter separado
+        target_user = usuario or ctx.author
+        steam_id = UserService.get_steam_id(str(target_user.id))
+
+        if not steam_id:
+             await ctx.send(embed=EmbedService.create_error_embed(f"{target_user.mention} não está cadastrado."))
+             return
+
+        # Matriz montada do histórico local; só as partidas novas são processadas
+        await asyncio.to_thread(SynergyService.refresh)
+        duos = SynergyService.get_duos(steam_id)
+        ranking = SynergyService.get_ranking()[:5]
+
+        def mention(sid):
+            discord_id = UserService.get_discord_id(sid)
+            return f"<@{discord_id}>" if discord_id else f"Steam: {sid[:8]}..."
+
+        def with_names(entries, pair=False):
+            return [
+                dict(d, display_name=" + ".join(mention(s) for s in d['steam_ids']) if pair else mention(d['steam_ids'][1]))
+                for d in entries
+            ]
+
+        best = duos[:3]
+        worst = list(reversed(duos[3:]))[:3]
+        embed = EmbedService.create_squad_embed(
+            target_user, with_names(best), with_names(worst), with_names(ranking, pair=True), SynergyService.MIN_MATCHES
+        )
+        await ctx.send(embed=embed)
 
     @commands.command(name="perfil", help="Mostra perfil completo com ranks, stats gerais e squad.")
     async def perfil(self, ctx, usuario: discord.User = None):
@@ -189,7 +260,7 @@ class CS2Commands(commands.Cog):
              await ctx.send(embed=EmbedService.create_error_embed(f"{target_user.mention} não está cadastrado."))
              return
 
-        profile = LeetifyService.get_user_profile(steam_id)
+        profile = await LeetifyService.get_user_profile(steam_id)
         if not profile:
              await ctx.send(embed=EmbedService.create_error_embed("Erro ao buscar perfil."))
              return
@@ -198,26 +269,20 @@ class CS2Commands(commands.Cog):
         recent_teammates = profile.get('recent_teammates', [])[:3]
         squad_data = []
         
-        # Mapeamento rápido
-        import json
-        steam_to_discord = {}
-        try:
-            with open('data/users.json', 'r') as f:
-                steam_to_discord = {v: k for k, v in json.load(f).items()}
-        except: pass
-
         for tm in recent_teammates:
             sid = tm.get('steam64_id')
             name = f"Steam: {sid[:8]}..."
-            if sid in steam_to_discord:
+            discord_id = UserService.get_discord_id(sid)
+            if discord_id:
                 try:
-                    u = await self.bot.fetch_user(int(steam_to_discord[sid]))
+                    u = await self.bot.fetch_user(int(discord_id))
                     name = u.mention
                 except: pass
             
             squad_data.append({'display_name': name, 'count': tm.get('recent_matches_count', 0)})
 
         embed = EmbedService.create_profile_embed(target_user, profile, squad_data)
+        EmbedService.add_stale_marker(embed, LeetifyService.stale_data_age())
         await ctx.send(embed=embed)
 
     @commands.command(name="xit", help="Conta quantos cheaters foram encontrados nas últimas X partidas.")
@@ -229,15 +294,16 @@ class CS2Commands(commands.Cog):
              await ctx.send(embed=EmbedService.create_error_embed(f"{target_user.mention} não está cadastrado."))
              return
              
-        matches = LeetifyService.get_recent_matches(steam_id)
+        limit = max(1, min(limite, 100))
+        matches = await self._get_history(steam_id, limit)
         if not matches:
              await ctx.send(embed=EmbedService.create_error_embed("Sem dados recentes."))
              return
 
-        limit = max(1, min(limite, 100))
-        report = StatsService.analyze_cheaters(matches[:limit])
+        report = StatsService.analyze_cheaters(matches)
         
         embed = EmbedService.create_cheater_report_embed(target_user, report)
+        EmbedService.add_stale_marker(embed, LeetifyService.stale_data_age())
         await ctx.send(embed=embed)
 
     @commands.command(name="recentes", help="Mostra as últimas 5 partidas.")
@@ -249,7 +315,7 @@ class CS2Commands(commands.Cog):
              await ctx.send(embed=EmbedService.create_error_embed(f"{target_user.mention} não está cadastrado."))
              return
              
-        matches = LeetifyService.get_recent_matches(steam_id)
+        matches = await LeetifyService.get_recent_matches(steam_id)
         if not matches:
              await ctx.send(embed=EmbedService.create_error_embed("Nenhuma partida encontrada."))
              return
@@ -258,47 +324,57 @@ class CS2Commands(commands.Cog):
         recent_matches = matches[:5]
         
         embed = EmbedService.create_recent_matches_embed(target_user, recent_matches, steam_id)
+        EmbedService.add_stale_marker(embed, LeetifyService.stale_data_age())
         await ctx.send(embed=embed)
 
 
 
-    @commands.command(name="leaderboard", aliases=["ranking", "top"], help="Mostra ranking de todos os usuários cadastrados.")
-    async def leaderboard(self, ctx):
+    @commands.command(name="leaderboard", aliases=["ranking", "top"], help="Mostra ranking de todos os usuários cadastrados (janela: N, hoje, semana, mes ou tudo).")
+    async def leaderboard(self, ctx, janela: str = None):
         '''
         Exibe um ranking com stats de todos os usuários cadastrados.
         '''
-        import json
-        import os
-        
-        if not os.path.exists('data/users.json'):
+        users = UserService.get_all_users()
+        if not users:
             await ctx.send(embed=EmbedService.create_error_embed("Nenhum usuário cadastrado."))
             return
 
-        with open('data/users.json', 'r') as f:
-            users = json.load(f)
-
-        if not users:
-            await ctx.send(embed=EmbedService.create_error_embed("Nenhum usuário cadastrado."))
+        try:
+            limit, since, period = MatchHistoryService.parse_window(janela)
+        except ValueError:
+            await ctx.send(embed=EmbedService.create_error_embed("Janela inválida. Use um número, `hoje`, `semana`, `mes` ou `tudo`."))
             return
 
-        # Coletar stats de todos os usuários
+        all_stats = {}
+        window = RollingStatsService.window_name(janela)
+        if window:
+            # Janelas fixas já vêm agregadas conforme as partidas chegam
+            for discord_id, steam_id in users.items():
+                try:
+                    all_stats[discord_id] = await self._get_rolling_stats(steam_id, window)
+                except Exception as e:
+                    logger.error(f"Erro ao processar usuário {discord_id}: {e}")
+        else:
+            # Demais janelas: partidas de todos os usuários agregadas de uma vez
+            players = {}
+            for discord_id, steam_id in users.items():
+                try:
+                    players[discord_id] = (await self._get_history(steam_id, limit, since), steam_id)
+                except Exception as e:
+                    logger.error(f"Erro ao processar usuário {discord_id}: {e}")
+            all_stats = await asyncio.to_thread(ColumnarStatsService.calculate_many, players)
+
         user_stats = []
-        for discord_id, steam_id in users.items():
+        for discord_id, stats in all_stats.items():
+            if not stats:
+                continue
             try:
                 discord_user = await self.bot.fetch_user(int(discord_id))
-                matches = LeetifyService.get_recent_matches(steam_id)
-                
-                if not matches:
-                    continue
-                
-                # Calcular stats usando o StatsService
-                stats = StatsService.calculate_average_stats(matches[:10], steam_id)
-                if stats:
-                    user_stats.append({
-                        'discord_user': discord_user,
-                        'avg_kd': stats['avg_kd'],
-                        'matches_played': stats['matches_count']
-                    })
+                user_stats.append({
+                    'discord_user': discord_user,
+                    'avg_kd': stats['avg_kd'],
+                    'matches_played': stats['matches_count']
+                })
             except Exception as e:
                 logger.error(f"Erro ao processar usuário {discord_id}: {e}")
                 continue
@@ -311,7 +387,7 @@ class CS2Commands(commands.Cog):
         user_stats.sort(key=lambda x: x['avg_kd'], reverse=True)
 
         # Criar view com botões de navegação
-        view = LeaderboardView(user_stats, ctx.author)
+        view = LeaderboardView(user_stats, ctx.author, LeetifyService.stale_data_age(), period)
         embed = view.create_embed(0)
         await ctx.send(embed=embed, view=view)
 
@@ -324,12 +400,22 @@ class CS2Commands(commands.Cog):
         ConfigService.set_notification_channel(ctx.channel.id)
         await ctx.send(f"✅ Canal {ctx.channel.mention} configurado para receber notificações de partidas!")
 
-    @tasks.loop(minutes=45)
+    @tasks.loop(seconds=PollerService.POLL_TICK)
     async def check_new_matches(self):
         '''
-        Task que roda a cada 45 minutos para verificar novas partidas.
+        Task que roda a cada POLL_TICK segundos para verificar novas partidas.
+
+        Com POLLER_MODE=workers o polling fica com os processos de worker.py e
+        o bot apenas incorpora o histórico gravado por eles; as notificações
+        chegam pela outbox compartilhada.
         '''
         try:
+            if ShardService.ENABLED:
+                # O limite da API é dividido com os workers de polling
+                LeetifyService.set_rate_share(1 / (ShardService.worker_count() + 1))
+                await asyncio.to_thread(MatchHistoryService.refresh)
+                return
+
             channel_id = ConfigService.get_notification_channel()
             if not channel_id:
                 logger.info("Canal de notificações não configurado.")
@@ -340,38 +426,8 @@ class CS2Commands(commands.Cog):
                 logger.error(f"Canal {channel_id} não encontrado.")
                 return
 
-            # Carregar todos os usuários cadastrados
-            import json
-            import os
-            if not os.path.exists('data/users.json'):
-                return
-
-            with open('data/users.json', 'r') as f:
-                users = json.load(f)
-
-            for discord_id, steam_id in users.items():
-                # Buscar partidas recentes
-                matches = LeetifyService.get_recent_matches(steam_id)
-                if not matches:
-                    continue
-
-                latest_match = matches[0]
-                latest_match_id = latest_match.get('id')
-
-                # Comparar com última partida conhecida
-                last_known_id = MatchTrackerService.get_last_match_id(discord_id)
-
-                if last_known_id != latest_match_id:
-                    # Nova partida encontrada!
-                    MatchTrackerService.update_last_match(discord_id, latest_match_id)
-
-                    # Buscar detalhes completos
-                    match_details = LeetifyService.get_match_details(latest_match_id)
-                    if not match_details:
-                        continue
-
-                    # Montar notificação
-                    await self._send_match_notification(channel, discord_id, match_details)
+            # Cópia dos cadastros: !cadastro pode rodar durante o ciclo
+            await PollerService.run_cycle(channel_id, UserService.get_all_users())
 
         except Exception as e:
             logger.error(f"Erro no check_new_matches: {e}")
@@ -379,37 +435,36 @@ class CS2Commands(commands.Cog):
     @check_new_matches.before_loop
     async def before_check_new_matches(self):
         await self.bot.wait_until_ready()
+        OutboxService.start(self._deliver_notification)
 
-    async def _send_match_notification(self, channel, discord_id, match):
+    async def _deliver_notification(self, job: dict):
         '''
-        Envia notificação de nova partida.
+        Envia uma notificação de nova partida da outbox, com uma seção por cadastrado.
+
+        Exceções são propagadas para o OutboxService tentar novamente.
         '''
-        try:
-            user = await self.bot.fetch_user(int(discord_id))
+        channel = self.bot.get_channel(job['channel_id']) or await self.bot.fetch_channel(job['channel_id'])
+        payload = job['payload']
+
+        # Detalhes já estão em disco (MatchStoreService) desde o enfileiramento
+        match = await LeetifyService.get_match_details(payload['match_id'], Priority.BACKGROUND)
+        if not match:
+            raise RuntimeError(f"detalhes da partida {payload['match_id']} indisponíveis")
+
+        players = []
+        for discord_id in payload['participants']:
             steam_id = UserService.get_steam_id(discord_id)
-            
-            # Buscar stats do jogador
             player_stats = StatsService.extract_player_stats(match, steam_id)
             if not player_stats:
-                return
-
-            # Verificar outros usuários cadastrados na partida
-            other_registered = []
-            import json
-            if os.path.exists('data/users.json'):
-                with open('data/users.json', 'r') as f:
-                    all_users = json.load(f)
-                    registered_steam_ids = set(all_users.values())
-                
-                for stat in match.get('stats', []):
-                    if stat['steam64_id'] in registered_steam_ids and stat['steam64_id'] != steam_id:
-                        other_registered.append(stat.get('name', 'Unknown'))
+                continue
+            user = await self.bot.fetch_user(int(discord_id))
+            players.append({'user': user, 'stats': player_stats})
 
-            embed = EmbedService.create_notification_embed(user, match, player_stats, other_registered)
-            await channel.send(embed=embed)
+        if not players:
+            return
 
-        except Exception as e:
-            logger.error(f"Erro ao enviar notificação: {e}")
+        embed = EmbedService.create_notification_embed(match, players)
+        await channel.send(embed=embed)
 
     @commands.command(name="ajuda", help="Lista personalizada de comandos.")
     async def ajuda(self, ctx):
@@ -429,10 +484,10 @@ class CS2Commands(commands.Cog):
         embed.add_field(
             name="📊 Stats e Performance",
             value=(
-                "`!performance [@user]` - Stats das últimas partidas\n"
+                "`!performance [@user] [janela]` - Stats por janela (N, hoje, semana, mes, tudo)\n"
                 "`!recentes [@user]` - Últimas 5 partidas com stats detalhados\n"
-                "`!kd [@user]` - K/D, HS%, Rating e Win Rate%\n"
-                "`!leaderboard` - Ranking de todos os usuários"
+                "`!kd [@user] [janela]` - K/D, HS%, Rating e Win Rate%\n"
+                "`!leaderboard [janela]` - Ranking de todos os usuários"
             ),
             inline=False
         )
@@ -440,7 +495,7 @@ class CS2Commands(commands.Cog):
             name="🎮 Partidas e Squad",
             value=(
                 "`!partida <match_id>` - Análise detalhada de uma partida\n"
-                "`!squad [@user]` - Companheiros de equipe frequentes\n"
+                "`!squad [@user]` - Melhores/piores duplas e ranking de duplas\n"
                 "`!xit [@user] [limite]` - Conta cheaters encontrados"
             ),
             inline=False
@@ -3,12 +3,13 @@ from discord.ext import commands, tasks
 import logging
 import random
 import datetime
-import json
-import os
 from services.config_service import ConfigService
+from services.user_service import UserService
 from services.leetify_service import LeetifyService
-from services.stats_service import StatsService
+from services.match_history_service import MatchHistoryService
+from services.rolling_stats_service import RollingStatsService
 from services.embed_service import EmbedService
+from services.rate_limit_service import Priority
 
 logger = logging.getLogger(__name__)
 
@@ -76,50 +77,39 @@ class PeriodicTasks(commands.Cog):
         if not channel:
             return
 
-        # Carregar usuários
-        if not os.path.exists('data/users.json'):
-            return
-
-        with open('data/users.json', 'r') as f:
-            users = json.load(f)
-
+        users = UserService.get_all_users()
         if not users:
             return
 
-        user_stats = []
+        # Agregados das últimas 5 partidas, mantidos pelo poller conforme as partidas chegam
+        all_stats = {}
         for discord_id, steam_id in users.items():
             try:
-                # Pegar apenas as MUITO recentes (últimas 24h seria ideal, mas API não filtra por tempo, 
-                # então pegamos as últimas 5 e vemos se foram 'hoje')
-                # Para simplificar este MVP, vamos pegar as últimas 20 partidas e filtrar localmente se possível,
-                # ou apenas fazer um ranking das últimas 20 partidas gerais ("Momento Atual")
-                
-                matches = LeetifyService.get_recent_matches(steam_id)
-                # O ideal seria filtrar por data, mas o objeto match summary pode não ter data explícita fácil sem detalhe
-                # O summary tem 'finished_at'? Não tenho certeza sem ver o JSON real, mas assumo que sim ou similar.
-                # Se não tiver, vamos fazer ranking das "Últimas 5"
-                
-                recent_matches = matches[:5] 
-                stats = StatsService.calculate_average_stats(recent_matches, steam_id)
-                
-                if stats:
-                    discord_user = self.bot.get_user(int(discord_id))
-                    if not discord_user:
-                        try:
-                            discord_user = await self.bot.fetch_user(int(discord_id))
-                        except:
-                            discord_user = None
-                    
-                    if discord_user:
-                        user_stats.append({
-                            'name': discord_user.display_name,
-                            'kd': stats['avg_kd'],
-                            'rating': stats['avg_rating'],
-                            'winrate': stats['win_rate']
-                        })
+                if not MatchHistoryService.has_player(steam_id):
+                    await LeetifyService.get_recent_matches(steam_id, Priority.BACKGROUND)
+                all_stats[discord_id] = RollingStatsService.get_stats(steam_id, 'last5')
             except Exception as e:
                 logger.error(f"Erro ao processar resumo para {discord_id}: {e}")
 
+        user_stats = []
+        for discord_id, stats in all_stats.items():
+            if not stats:
+                continue
+            discord_user = self.bot.get_user(int(discord_id))
+            if not discord_user:
+                try:
+                    discord_user = await self.bot.fetch_user(int(discord_id))
+                except:
+                    discord_user = None
+            
+            if discord_user:
+                user_stats.append({
+                    'name': discord_user.display_name,
+                    'kd': stats['avg_kd'],
+                    'rating': stats['avg_rating'],
+                    'winrate': stats['win_rate']
+                })
+
         if not user_stats:
             return
 
@@ -5,6 +5,11 @@ import os
 import asyncio
 from dotenv import load_dotenv
 
+# Antes de importar os serviços: as configurações são lidas do ambiente na importação
+load_dotenv()
+
+from services.leetify_service import LeetifyService
+
 logging.basicConfig(
     level=logging.INFO,
     format='[ %(asctime)s ] {%(filename)s:%(lineno)d} %(levelname)s - %(message)s',
@@ -27,8 +32,6 @@ def get_token(token_name: str) -> str:
     '''
     return os.getenv(token_name)
 
-load_dotenv()
-
 intents = discord.Intents.default()
 intents.message_content = True
 
@@ -72,9 +75,12 @@ async def main():
         logger.error("Token não encontrado!")
         return
 
-    async with bot:
-        await load_cogs()
-        await bot.start(token)
+    try:
+        async with bot:
+            await load_cogs()
+            await bot.start(token)
+    finally:
+        await LeetifyService.close()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,121 @@
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    '''
+    Cache em memória com expiração por entrada (TTL) e limite de tamanho (LRU).
+
+    Qualquer objeto com a mesma interface (get, set, invalidate, clear, stats)
+    pode substituir esta implementação no LeetifyService.
+    '''
+
+    def __init__(self, maxsize: int = 1024, default_ttl: float = 60.0):
+        '''
+        Args:
+            maxsize (int): Número máximo de entradas antes de descartar a menos usada.
+            default_ttl (float): Tempo de vida padrão das entradas, em segundos.
+        '''
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        '''
+        Recupera um valor do cache, contabilizando hit ou miss.
+
+        Args:
+            key: Chave da entrada.
+            default: Valor retornado se a chave não existir ou tiver expirado.
+
+        Returns:
+            Any: O valor armazenado ou o default.
+        '''
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        '''
+        Armazena um valor no cache.
+
+        Args:
+            key: Chave da entrada.
+            value: Valor a ser armazenado.
+            ttl (float): Tempo de vida em segundos. Usa o default_ttl se omitido.
+        '''
+        ttl = self.default_ttl if ttl is None else ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        '''
+        Remove uma entrada do cache.
+
+        Returns:
+            bool: True se a entrada existia.
+        '''
+        return self._data.pop(key, None) is not None
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        '''
+        Remove todas as entradas cujas chaves satisfazem o predicado.
+
+        Returns:
+            int: Quantidade de entradas removidas.
+        '''
+        keys = [k for k in self._data if predicate(k)]
+        for k in keys:
+            del self._data[k]
+        return len(keys)
+
+    def clear(self):
+        '''
+        Remove todas as entradas do cache (os contadores são mantidos).
+        '''
+        self._data.clear()
+
+    def stats(self) -> dict:
+        '''
+        Retorna os contadores de uso do cache.
+
+        Returns:
+            dict: Tamanho atual, hits, misses, evictions e taxa de acerto.
+        '''
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits / total) * 100 if total else 0.0
+        }
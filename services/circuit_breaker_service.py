@@ -0,0 +1,91 @@
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    '''
+    Circuit breaker para chamadas a um serviço externo.
+
+    Estados:
+        closed: chamadas liberadas; falhas consecutivas são contadas.
+        open: chamadas falham imediatamente até o fim do reset_timeout.
+        half_open: uma única chamada de teste é liberada; sucesso fecha o
+            circuito e falha o reabre.
+    '''
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        '''
+        Args:
+            name (str): Nome do serviço protegido, usado nos logs.
+            failure_threshold (int): Falhas consecutivas para abrir o circuito.
+            reset_timeout (float): Segundos em aberto antes de liberar um teste.
+        '''
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def is_closed(self) -> bool:
+        return self.state == CircuitBreaker.CLOSED
+
+    def allow_request(self) -> bool:
+        '''
+        Indica se uma chamada pode ser feita agora.
+
+        Returns:
+            bool: False enquanto o circuito estiver aberto (ou já houver um teste em andamento).
+        '''
+        if self.state == CircuitBreaker.CLOSED:
+            return True
+
+        if self.state == CircuitBreaker.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = CircuitBreaker.HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"Circuito {self.name} meio-aberto, liberando chamada de teste")
+
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self):
+        '''
+        Registra uma chamada bem-sucedida, fechando o circuito.
+        '''
+        if self.state != CircuitBreaker.CLOSED:
+            logger.info(f"Circuito {self.name} fechado, serviço respondendo novamente")
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        '''
+        Registra uma falha. Abre o circuito ao atingir o limite ou se o teste falhar.
+        '''
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == CircuitBreaker.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != CircuitBreaker.OPEN:
+                logger.warning(f"Circuito {self.name} aberto após {self.failures} falhas")
+            self.state = CircuitBreaker.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        '''
+        Retorna o estado atual do circuito.
+        '''
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'open_for': round(time.monotonic() - self.opened_at, 1) if self.state == CircuitBreaker.OPEN else 0.0
+        }
@@ -0,0 +1,259 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+from services.match_history_service import MatchHistoryService
+from services.stats_service import StatsService
+
+try:
+    import numpy as np
+except ImportError:  # Backend opcional; sem ele a agregação roda em Python puro
+    np = None
+
+logger = logging.getLogger(__name__)
+
+class StatsTable:
+    '''
+    Estatísticas numéricas de vários jogadores, um bloco de linhas por jogador.
+
+    Cada linha é uma partida do jogador, na ordem de COLUMNS. Os blocos ficam
+    em cache (partidas finalizadas não mudam), de modo que consultas
+    repetidas, como o !leaderboard, só refazem a agregação. Com NumPy cada
+    bloco vira uma matriz float64 uma única vez.
+    '''
+
+    COLUMNS = ('kills', 'deaths', 'hs_kills', 'damage', 'kd', 'rating', 'win', 'finished_at', 'map')
+    KILLS, DEATHS, HS_KILLS, DAMAGE, KD, RATING, WIN, FINISHED_AT, MAP = range(len(COLUMNS))
+
+    BLOCK_CACHE_MAX_SIZE = 20_000
+    # (steam_id, IDs das partidas) -> linhas do jogador, do menos para o mais recente usado
+    _blocks: "OrderedDict[tuple, tuple]" = OrderedDict()
+    # Mesma chave -> matriz NumPy das linhas
+    _matrices: Dict[tuple, object] = {}
+    # Nome do mapa -> código numérico (coluna 'map')
+    _map_codes: Dict[str, int] = {}
+    # Códigos atribuídos também pelo RollingStatsService, no event loop
+    _map_lock = threading.Lock()
+    # Tabelas são montadas também em threads (asyncio.to_thread)
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.keys: List[Hashable] = []
+        self.block_keys: List[tuple] = []
+        # Referência própria às linhas: o cache pode descartar o bloco durante a montagem
+        self.block_rows: List[tuple] = []
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self.block_rows)
+
+    @staticmethod
+    def map_code(map_name: str) -> Optional[int]:
+        return StatsTable._map_codes.get(map_name)
+
+    @staticmethod
+    def _assign_map_code(map_name: str) -> int:
+        code = StatsTable._map_codes.get(map_name)
+        if code is None:
+            with StatsTable._map_lock:
+                code = StatsTable._map_codes.setdefault(map_name, len(StatsTable._map_codes))
+        return code
+
+    def add_player(self, key: Hashable, matches: List[Dict], steam_id: str):
+        '''
+        Adiciona as partidas de um jogador à tabela.
+
+        Args:
+            key: Identificador do resultado (ex.: Discord ID).
+            matches: Partidas do jogador.
+            steam_id: Steam ID do jogador.
+        '''
+        block_key = (steam_id, tuple(m.get('id') for m in matches))
+        blocks = StatsTable._blocks
+        with StatsTable._lock:
+            rows = blocks.get(block_key)
+            if rows is not None:
+                blocks.move_to_end(block_key)
+        if rows is None:
+            rows = StatsTable.build_rows(matches, steam_id)
+            with StatsTable._lock:
+                # Descarta os blocos usados há mais tempo
+                while len(blocks) >= StatsTable.BLOCK_CACHE_MAX_SIZE:
+                    evicted, _ = blocks.popitem(last=False)
+                    StatsTable._matrices.pop(evicted, None)
+                blocks[block_key] = rows
+        self.keys.append(key)
+        self.block_keys.append(block_key)
+        self.block_rows.append(rows)
+
+    def blocks(self) -> List[tuple]:
+        return self.block_rows
+
+    def matrices(self) -> list:
+        '''
+        Retorna a matriz NumPy (linhas x COLUMNS) de cada jogador.
+        '''
+        result = []
+        for block_key, rows in zip(self.block_keys, self.block_rows):
+            matrix = StatsTable._matrices.get(block_key)
+            if matrix is None:
+                matrix = np.array(rows, dtype=np.float64).reshape(-1, len(StatsTable.COLUMNS))
+                with StatsTable._lock:
+                    if block_key in StatsTable._blocks:
+                        StatsTable._matrices[block_key] = matrix
+            result.append(matrix)
+        return result
+
+    @staticmethod
+    def build_rows(matches: List[Dict], steam_id: str) -> tuple:
+        '''
+        Extrai as linhas (ordem de COLUMNS) do jogador nas partidas informadas.
+        '''
+        rows = []
+        for match in matches:
+            player_stats = StatsService.extract_player_stats(match, steam_id)
+            if not player_stats:
+                continue
+            get = player_stats.get
+            rows.append((
+                get('total_kills', 0), get('total_deaths', 0), get('total_hs_kills', 0),
+                get('total_damage', 0) or 0, get('kd_ratio', 0), get('leetify_rating', 0),
+                match.get('winner_team_number') == get('initial_team_number'),
+                MatchHistoryService.match_timestamp(match),
+                StatsTable._assign_map_code(match.get('map_name') or 'unknown')
+            ))
+        return tuple(rows)
+
+class ColumnarStatsService:
+    '''
+    Agregação de estatísticas de vários jogadores em uma única passada.
+
+    Produz o mesmo dicionário de StatsService.calculate_average_stats, mas
+    operando sobre colunas (NumPy quando instalado) em vez de percorrer os
+    dicionários de partida jogador por jogador. As somas seguem a ordem das
+    partidas, então os resultados são idênticos aos do cálculo original.
+    '''
+
+    BACKEND = 'numpy' if np is not None else 'python'
+
+    @staticmethod
+    def build_table(players: Dict[Hashable, Tuple[List[Dict], str]]) -> StatsTable:
+        '''
+        Empacota as partidas de vários jogadores.
+
+        Args:
+            players: Dicionário chave -> (partidas, steam_id).
+        '''
+        table = StatsTable()
+        for key, (matches, steam_id) in players.items():
+            table.add_player(key, matches or [], steam_id)
+        return table
+
+    @staticmethod
+    def calculate_many(players: Dict[Hashable, Tuple[List[Dict], str]], since: Optional[float] = None,
+                       map_name: Optional[str] = None) -> Dict[Hashable, Optional[Dict]]:
+        '''
+        Calcula as médias de estatísticas de vários jogadores.
+
+        Args:
+            players: Dicionário chave -> (partidas, steam_id).
+            since: Considera apenas partidas terminadas a partir deste epoch.
+            map_name: Considera apenas partidas neste mapa.
+
+        Returns:
+            Dict: chave -> médias (mesmo formato de calculate_average_stats) ou None.
+        '''
+        return ColumnarStatsService.aggregate(ColumnarStatsService.build_table(players), since, map_name)
+
+    @staticmethod
+    def aggregate(table: StatsTable, since: Optional[float] = None,
+                  map_name: Optional[str] = None) -> Dict[Hashable, Optional[Dict]]:
+        '''
+        Agrega uma tabela já empacotada, por jogador.
+        '''
+        map_code = StatsTable.map_code(map_name) if map_name is not None else None
+        if map_name is not None and map_code is None:
+            return {key: None for key in table.keys}
+
+        if np is not None:
+            sums = ColumnarStatsService._sums_numpy(table, since, map_code)
+        else:
+            sums = ColumnarStatsService._sums_python(table, since, map_code)
+
+        results = {}
+        for owner, key in enumerate(table.keys):
+            count, kills, deaths, kd, hs_pct, rating, wins = (column[owner] for column in sums)
+            count = int(count)
+            if count == 0:
+                results[key] = None
+                continue
+            wins = int(wins)
+            results[key] = {
+                'matches_count': count,
+                'avg_kd': float(kd) / count,
+                'avg_hs_pct': float(hs_pct) / count,
+                'avg_rating': float(rating) / count,
+                'win_rate': (wins / count) * 100,
+                'wins': wins,
+                'losses': count - wins,
+                'total_kills': int(kills),
+                'total_deaths': int(deaths)
+            }
+        return results
+
+    @staticmethod
+    def _sums_numpy(table: StatsTable, since: Optional[float], map_code: Optional[int]) -> tuple:
+        t = StatsTable
+        size = len(table.keys)
+        matrices = table.matrices()
+        width = len(t.COLUMNS)
+        matrix = np.concatenate(matrices) if matrices else np.zeros((0, width))
+        owner = np.repeat(np.arange(size), [len(m) for m in matrices])
+
+        mask = np.ones(len(matrix), dtype=bool)
+        if since is not None:
+            mask &= matrix[:, t.FINISHED_AT] >= since
+        if map_code is not None:
+            mask &= matrix[:, t.MAP] == map_code
+        matrix = matrix[mask]
+        owner = owner[mask]
+
+        kills = matrix[:, t.KILLS]
+        has_kills = kills > 0
+        # Mesma ordem de operações do cálculo original: (hs / kills) * 100
+        hs_pct = np.where(has_kills, matrix[:, t.HS_KILLS] / np.where(has_kills, kills, 1) * 100, 0.0)
+
+        def total(values):
+            return np.bincount(owner, weights=values, minlength=size)
+
+        return (
+            np.bincount(owner, minlength=size),
+            total(kills),
+            total(matrix[:, t.DEATHS]),
+            total(matrix[:, t.KD]),
+            total(hs_pct),
+            total(matrix[:, t.RATING]),
+            total(matrix[:, t.WIN])
+        )
+
+    @staticmethod
+    def _sums_python(table: StatsTable, since: Optional[float], map_code: Optional[int]) -> tuple:
+        size = len(table.keys)
+        count, kills_sum, deaths_sum, wins = [0] * size, [0] * size, [0] * size, [0] * size
+        kd_sum, hs_sum, rating_sum = [0.0] * size, [0.0] * size, [0.0] * size
+
+        for owner, rows in enumerate(table.blocks()):
+            for kills, deaths, hs_kills, _, kd, rating, win, finished_at, map_index in rows:
+                if since is not None and finished_at < since:
+                    continue
+                if map_code is not None and map_index != map_code:
+                    continue
+                count[owner] += 1
+                kills_sum[owner] += kills
+                deaths_sum[owner] += deaths
+                kd_sum[owner] += kd
+                rating_sum[owner] += rating
+                if kills > 0:
+                    hs_sum[owner] += (hs_kills / kills) * 100
+                wins[owner] += win
+
+        return count, kills_sum, deaths_sum, kd_sum, hs_sum, rating_sum, wins
@@ -1,6 +1,5 @@
-import json
-import os
 import logging
+from services.storage_service import StorageService
 
 logger = logging.getLogger(__name__)
 
@@ -8,40 +7,8 @@ class ConfigService:
     '''
     Serviço responsável pelas configurações do bot.
     '''
-    
-    DATA_FILE = 'data/config.json'
 
-    @staticmethod
-    def _load_config() -> dict:
-        '''
-        Carrega as configurações do arquivo JSON.
-
-        Returns:
-            dict: Configurações do bot.
-        '''
-        if not os.path.exists(ConfigService.DATA_FILE):
-            return {}
-        
-        try:
-            with open(ConfigService.DATA_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Erro ao carregar config: {e}")
-            return {}
-
-    @staticmethod
-    def _save_config(config: dict):
-        '''
-        Salva as configurações no arquivo JSON.
-
-        Args:
-            config (dict): As configurações a serem salvas.
-        '''
-        try:
-            with open(ConfigService.DATA_FILE, 'w') as f:
-                json.dump(config, f, indent=4)
-        except Exception as e:
-            logger.error(f"Erro ao salvar config: {e}")
+    TABLE = 'config'
 
     @staticmethod
     def get_notification_channel() -> int:
@@ -51,8 +18,7 @@ class ConfigService:
         Returns:
             int: O channel ID ou None se não configurado.
         '''
-        config = ConfigService._load_config()
-        channel_id = config.get('notification_channel_id')
+        channel_id = StorageService.get_backend().get(ConfigService.TABLE, 'notification_channel_id')
         return int(channel_id) if channel_id else None
 
     @staticmethod
@@ -63,7 +29,5 @@ class ConfigService:
         Args:
             channel_id (int): ID do canal do Discord.
         '''
-        config = ConfigService._load_config()
-        config['notification_channel_id'] = str(channel_id)
-        ConfigService._save_config(config)
+        StorageService.get_backend().upsert_many(ConfigService.TABLE, {'notification_channel_id': str(channel_id)})
         logger.info(f"Canal de notificações configurado para {channel_id}")
@@ -1,5 +1,6 @@
 import discord
 from typing import Dict, List, Optional
+from services.stats_service import StatsService
 
 class EmbedService:
     '''
@@ -14,6 +15,24 @@ class EmbedService:
             color=0xFF0000
         )
 
+    @staticmethod
+    def add_stale_marker(embed: discord.Embed, stale_age: Optional[float]) -> discord.Embed:
+        '''
+        Indica no rodapé que os dados vieram do cache porque o Leetify está indisponível.
+
+        Args:
+            embed: Embed a ser marcado.
+            stale_age: Idade dos dados em segundos (None para não marcar).
+        '''
+        if stale_age is None:
+            return embed
+
+        minutes = max(1, round(stale_age / 60))
+        marker = f"⏳ dados em cache de {minutes} min atrás"
+        footer = embed.footer.text if embed.footer and embed.footer.text else None
+        embed.set_footer(text=f"{footer} • {marker}" if footer else marker)
+        return embed
+
     @staticmethod
     def _get_humorous_comment(kd: float, win_rate: float = 50.0) -> str:
         if kd < 0.6:
@@ -32,14 +51,15 @@ class EmbedService:
             return "🤖 **ATIVOU O SPINBOT?**"
 
     @staticmethod
-    def create_performance_embed(user: discord.User, stats: Dict) -> discord.Embed:
+    def create_performance_embed(user: discord.User, stats: Dict, period: str = None) -> discord.Embed:
         count = stats['matches_count']
         kd = stats['avg_kd']
         comment = EmbedService._get_humorous_comment(kd, stats['win_rate'])
+        summary = f"Análise de **{count}** partidas ({period})" if period else f"Análise das últimas **{count}** partidas"
         
         embed = discord.Embed(
             title=f"📊 Performance de {user.display_name}",
-            description=f"Análise das últimas **{count}** partidas\n\n{comment}",
+            description=f"{summary}\n\n{comment}",
             color=0x0099FF
         )
         embed.add_field(name="K/D", value=f"**{stats['avg_kd']:.2f}**", inline=True)
@@ -85,6 +105,44 @@ class EmbedService:
         embed.set_footer(text=f"Match ID: {match_details.get('id')}")
         return embed
 
+    @staticmethod
+    def create_squad_embed(user: discord.User, best: List[Dict], worst: List[Dict], ranking: List[Dict],
+                           min_matches: int) -> discord.Embed:
+        '''
+        Melhores e piores duplas de um jogador e o ranking de duplas do servidor.
+
+        Args:
+            best / worst / ranking: Listas de {'display_name', 'matches', 'wins', 'win_rate'}.
+            min_matches: Mínimo de partidas juntos considerado.
+        '''
+        embed = discord.Embed(
+            title=f"👥 Squad de {user.display_name}",
+            description=f"Duplas no mesmo time, com pelo menos {min_matches} partidas juntos no histórico.",
+            color=0x00D9FF
+        )
+
+        def lines(duos):
+            return "\n".join(
+                f"{d['display_name']} - **{d['win_rate']:.0f}%** ({d['wins']}W/{d['matches'] - d['wins']}L)"
+                for d in duos
+            )
+
+        embed.add_field(name="🔥 Melhores Duplas", value=lines(best) or "Sem duplas suficientes.", inline=False)
+        if worst:
+            embed.add_field(name="💀 Piores Duplas", value=lines(worst), inline=False)
+
+        if ranking:
+            medals = ["🥇", "🥈", "🥉"]
+            ranking_text = "\n".join(
+                f"{medals[idx] if idx < 3 else f'{idx + 1}.'} {d['display_name']} - "
+                f"**{d['win_rate']:.0f}%** em {d['matches']} jogos"
+                for idx, d in enumerate(ranking)
+            )
+            embed.add_field(name="🏆 Ranking de Duplas do Servidor", value=ranking_text, inline=False)
+
+        embed.set_thumbnail(url=user.display_avatar.url)
+        return embed
+
     @staticmethod
     def create_profile_embed(user: discord.User, profile_data: Dict, squad_data: List[Dict] = None) -> discord.Embed:
         embed = discord.Embed(
@@ -162,27 +220,38 @@ class EmbedService:
         return embed
 
     @staticmethod
-    def create_notification_embed(user: discord.User, match: Dict, stats: Dict, other_players: List[str]) -> discord.Embed:
+    def create_notification_embed(match: Dict, players: List[Dict]) -> discord.Embed:
+        '''
+        Notificação de nova partida, com uma seção por jogador cadastrado.
+
+        Args:
+            match: Detalhes da partida.
+            players: Lista de {'user': discord.User, 'stats': stats do jogador na partida}.
+        '''
         map_name = match.get('map_name', 'Desconhecido')
         match_id = match.get('id')
-        kd = stats.get('kd_ratio', 0)
+        avg_kd = sum(p['stats'].get('kd_ratio', 0) for p in players) / len(players)
         
-        comment = EmbedService._get_humorous_comment(kd)
+        comment = EmbedService._get_humorous_comment(avg_kd)
+        mentions = ", ".join(p['user'].mention for p in players)
+        verb = "jogou" if len(players) == 1 else "jogaram"
 
         embed = discord.Embed(
             title="🆕 Nova Partida Detectada!",
-            description=f"**{user.mention}** jogou em **{map_name}**\n\n{comment}",
+            description=f"**{mentions}** {verb} em **{map_name}**\n\n{comment}",
             color=0x00FF00
         )
 
-        embed.add_field(
-            name="📊 Performance", 
-            value=f"K/D: {stats.get('kd_ratio', 0):.2f} ({stats.get('total_kills')}/{stats.get('total_deaths')})", 
-            inline=False
-        )
-        
-        if other_players:
-            embed.add_field(name="👥 Jogadores Cadastrados", value=", ".join(other_players), inline=False)
+        for player in players:
+            stats = player['stats']
+            embed.add_field(
+                name=f"📊 {player['user'].display_name}",
+                value=(
+                    f"K/D: {stats.get('kd_ratio', 0):.2f} ({stats.get('total_kills')}/{stats.get('total_deaths')}) | "
+                    f"Rating: {stats.get('leetify_rating', 0):.3f}"
+                ),
+                inline=False
+            )
 
         embed.set_footer(text=f"Use !partida {match_id} para ver detalhes")
         return embed
@@ -214,7 +283,7 @@ class EmbedService:
             # Tentar extrair stats usando StatsService logic se possível
             player_stats = None
             if 'stats' in match: 
-                player_stats = next((s for s in match['stats'] if s['steam64_id'] == steam_id), None)
+                player_stats = StatsService.extract_player_stats(match, steam_id)
             elif 'own_stats' in match: 
                 player_stats = match['own_stats']
             
@@ -0,0 +1,346 @@
+import json
+import logging
+import sys
+from abc import abstractmethod
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # Backend opcional; sem ele usamos o json da stdlib
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+_NULL = float('nan')
+
+class _Record(Mapping):
+    '''
+    Base dos registros compactos: acesso somente leitura no estilo dict.
+
+    Subclasses implementam _value() (abstrato; Mapping já usa ABCMeta);
+    campos ausentes no payload devolvem _MISSING, então get() usa o padrão e
+    "campo in registro" é False, como no dict original.
+    '''
+
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+
+    @abstractmethod
+    def _value(self, key):
+        '''
+        Valor do campo ou _MISSING se ausente no payload.
+        '''
+
+    def __getitem__(self, key):
+        value = self._value(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self._value(key)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key) -> bool:
+        return self._value(key) is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        return (field for field in self.FIELDS if self._value(field) is not _MISSING)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_dict() == (other.to_dict() if isinstance(other, _Record) else dict(other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> dict:
+        '''
+        Converte o registro de volta para o dict do payload.
+        '''
+        return {field: self[field] for field in self}
+
+class PlayerMatchStat(_Record):
+    '''
+    Estatísticas de um jogador em uma partida (item de match['stats']).
+
+    É apenas uma visão sobre as colunas da Match: os valores ficam
+    empacotados na partida e são lidos sob demanda.
+    '''
+
+    # Campos de texto e numéricos lidos por StatsService, EmbedService e cogs;
+    # o resto é descartado
+    TEXT_FIELDS = ('steam64_id', 'name')
+    NUMERIC_FIELDS = (
+        'initial_team_number', 'total_kills', 'total_deaths', 'kd_ratio', 'total_hs_kills',
+        'total_damage', 'dpr', 'mvps', 'leetify_rating', 'ct_leetify_rating', 't_leetify_rating'
+    )
+    # Guardados como float64 e devolvidos como int
+    INT_FIELDS = frozenset({'initial_team_number', 'total_kills', 'total_deaths', 'total_hs_kills', 'total_damage', 'mvps'})
+    FIELDS = TEXT_FIELDS + NUMERIC_FIELDS
+    COLUMN = {field: index for index, field in enumerate(NUMERIC_FIELDS)}
+
+    __slots__ = ('_match', '_row')
+
+    def __init__(self, match: 'Match', row: int):
+        self._match = match
+        self._row = row
+
+    def _value(self, key):
+        return self._match._cell(self._row, key)
+
+class Match(_Record):
+    '''
+    Partida da API (lista ou detalhes) em formato compacto.
+
+    Os campos simples ficam em __slots__; os números de todos os jogadores
+    ficam em um único array float64 (uma linha por jogador), e os campos
+    raros (RARE_FIELDS) ficam guardados como JSON, decodificados só quando
+    lidos. match['stats'] e o índice por jogador (players, montado na
+    ingestão) devolvem visões PlayerMatchStat sobre essas colunas.
+
+    Funciona como um dict somente leitura, então StatsService, EmbedService e
+    cogs continuam usando get() e [] normalmente.
+    '''
+
+    FIELDS = ('id', 'map_name', 'finished_at', 'has_banned_player', 'winner_team_number', 'stats', 'own_stats')
+    # Usados apenas por !partida e pela lista de partidas recentes
+    RARE_FIELDS = ('game_finished_at', 'data_source', 'replay_url', 'team_scores')
+    SCALAR_FIELDS = ('id', 'map_name', 'finished_at', 'has_banned_player', 'winner_team_number')
+
+    __slots__ = SCALAR_FIELDS + (
+        '_rare', '_steam_ids', '_names', '_numbers', '_size', '_absent', '_extra', '_flags',
+        '_stats', '_players', '_teams'
+    )
+
+    # Bits de _flags
+    _HAS_STATS = 1
+    _HAS_OWN = 2
+
+    def __init__(self, data: Mapping):
+        for field in self.SCALAR_FIELDS:
+            value = data.get(field, _MISSING)
+            if value is not _MISSING:
+                setattr(self, field, sys.intern(value) if field == 'map_name' and isinstance(value, str) else value)
+
+        rare = {field: data[field] for field in self.RARE_FIELDS if field in data}
+        # Como str: o buffer do orjson vem superdimensionado
+        self._rare = JsonService.dumps(rare).decode('utf-8') if rare else None
+
+        flags = 0
+        stats = data.get('stats')
+        rows = []
+        if isinstance(stats, (list, tuple)):
+            flags |= Match._HAS_STATS
+            rows = [s for s in stats if isinstance(s, Mapping)]
+        self._size = len(rows)
+        own_stats = data.get('own_stats')
+        if isinstance(own_stats, Mapping):
+            flags |= Match._HAS_OWN
+            rows.append(own_stats)
+        self._flags = flags
+        self._pack(rows)
+
+    def _pack(self, rows: List[Mapping]):
+        width = len(PlayerMatchStat.NUMERIC_FIELDS)
+        numbers = array('d', bytes(8 * width * len(rows)))
+        # Bit por célula (linha * largura + coluna): campo ausente no payload
+        absent = 0
+        extra = {}
+        steam_ids, names = [], []
+        for row, stat in enumerate(rows):
+            steam_id = stat.get('steam64_id', _MISSING)
+            name = stat.get('name', _MISSING)
+            # Steam IDs e nomes se repetem entre partidas do mesmo jogador
+            steam_ids.append(sys.intern(steam_id) if isinstance(steam_id, str) else steam_id)
+            names.append(sys.intern(name) if isinstance(name, str) else name)
+            base = row * width
+            for column, field in enumerate(PlayerMatchStat.NUMERIC_FIELDS):
+                value = stat.get(field, _MISSING)
+                if field in PlayerMatchStat.INT_FIELDS:
+                    packable = type(value) is int and abs(value) < 2 ** 53
+                else:
+                    packable = type(value) in (int, float)
+                if packable:
+                    numbers[base + column] = value
+                elif value is None:
+                    numbers[base + column] = _NULL
+                elif value is _MISSING:
+                    absent |= 1 << (base + column)
+                else:
+                    # Tipo inesperado: guardado como veio
+                    extra[(row, column)] = value
+
+        self._numbers = numbers
+        self._absent = absent
+        self._extra = extra or None
+        self._steam_ids = tuple(steam_ids)
+        self._names = tuple(names)
+
+        # Visões, índice e times montados uma única vez, compartilhando as mesmas visões
+        self._stats = tuple(PlayerMatchStat(self, row) for row in range(self._size))
+        self._players = {
+            steam_id: stat for steam_id, stat in zip(self._steam_ids, self._stats)
+            if isinstance(steam_id, str) and steam_id
+        }
+        teams = {}
+        for stat in self._stats:
+            teams.setdefault(stat.get('initial_team_number'), []).append(stat)
+        self._teams = {team: tuple(members) for team, members in teams.items()}
+
+    def _cell(self, row: int, key: str):
+        if key == 'steam64_id':
+            return self._steam_ids[row]
+        if key == 'name':
+            return self._names[row]
+        column = PlayerMatchStat.COLUMN.get(key)
+        if column is None:
+            return _MISSING
+        if self._extra is not None:
+            value = self._extra.get((row, column), self)
+            if value is not self:
+                return value
+        cell = row * len(PlayerMatchStat.NUMERIC_FIELDS) + column
+        if self._absent >> cell & 1:
+            return _MISSING
+        value = self._numbers[cell]
+        if value != value:
+            # NaN marca null no payload
+            return None
+        return int(value) if key in PlayerMatchStat.INT_FIELDS else value
+
+    def _value(self, key):
+        if key in self.SCALAR_FIELDS:
+            return getattr(self, key, _MISSING)
+        if key == 'stats':
+            if not self._flags & Match._HAS_STATS:
+                return _MISSING
+            return self._stats
+        if key == 'own_stats':
+            if not self._flags & Match._HAS_OWN:
+                return _MISSING
+            return PlayerMatchStat(self, self._size)
+        if key in self.RARE_FIELDS and self._rare is not None:
+            return JsonService.loads(self._rare).get(key, _MISSING)
+        return _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        yield from super().__iter__()
+        if self._rare is not None:
+            yield from JsonService.loads(self._rare)
+
+    def player(self, steam_id: str) -> Optional[PlayerMatchStat]:
+        '''
+        Estatísticas de um jogador da partida, em O(1).
+        '''
+        return self._players.get(steam_id)
+
+    @property
+    def players(self) -> Dict[str, PlayerMatchStat]:
+        '''
+        steam64_id -> estatísticas do jogador (somente leitura).
+        '''
+        return self._players
+
+    @property
+    def teams(self) -> Dict[Any, Tuple[PlayerMatchStat, ...]]:
+        '''
+        initial_team_number -> estatísticas dos jogadores do time (somente leitura).
+        '''
+        return self._teams
+
+    def to_dict(self) -> dict:
+        result = super().to_dict()
+        if 'stats' in result:
+            result['stats'] = [stat.to_dict() for stat in result['stats']]
+        if 'own_stats' in result:
+            result['own_stats'] = result['own_stats'].to_dict()
+        return result
+
+class JsonService:
+    '''
+    Decodificação de JSON e projeção dos payloads de partidas.
+
+    Usa orjson quando instalado. A projeção converte as partidas para o
+    modelo compacto (Match / PlayerMatchStat), que descarta os campos que o
+    bot não lê e reduz a memória ocupada pelas partidas em cache e no
+    histórico.
+    '''
+
+    BACKEND = 'orjson' if orjson else 'json'
+
+    @staticmethod
+    def loads(data: Union[bytes, str]) -> Any:
+        '''
+        Decodifica JSON com o backend mais rápido disponível.
+
+        Args:
+            data: Corpo da resposta (bytes ou str).
+
+        Returns:
+            Any: Objeto decodificado.
+        '''
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        '''
+        Codifica um objeto em JSON compacto (bytes UTF-8).
+        '''
+        if orjson is not None:
+            return orjson.dumps(obj, default=JsonService._default)
+        return json.dumps(obj, separators=(',', ':'), default=JsonService._default).encode('utf-8')
+
+    @staticmethod
+    def _default(obj: Any) -> Any:
+        # Match e PlayerMatchStat são gravados como o dict original
+        if isinstance(obj, _Record):
+            return obj.to_dict()
+        raise TypeError(f"Tipo não serializável em JSON: {type(obj).__name__}")
+
+    @staticmethod
+    def project_match(match: Any) -> Any:
+        '''
+        Converte uma partida (lista ou detalhes) para o modelo compacto Match,
+        mantendo apenas os campos usados.
+
+        Args:
+            match: Payload da partida. Valores que não são dict são devolvidos como estão.
+
+        Returns:
+            Any: Partida projetada.
+        '''
+        if not isinstance(match, dict):
+            return match
+        return Match(match)
+
+    @staticmethod
+    def as_match(match: Any) -> Any:
+        '''
+        Adaptador: aceita uma partida como Match ou dict e devolve um Match.
+
+        Partidas que já passaram pela ingestão são devolvidas como estão.
+        '''
+        if isinstance(match, Match) or not isinstance(match, Mapping):
+            return match
+        return Match(match)
+
+    @staticmethod
+    def project_matches(matches: Any) -> Any:
+        '''
+        Aplica project_match a cada item de uma lista de partidas.
+        '''
+        if not isinstance(matches, list):
+            return matches
+        return [JsonService.project_match(m) for m in matches]
@@ -1,15 +1,83 @@
-import requests
+import aiohttp
+import asyncio
 import os
 import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+from services.cache_service import TTLCache
+from services.circuit_breaker_service import CircuitBreaker
+from services.json_service import JsonService
+from services.match_history_service import MatchHistoryService
+from services.match_store_service import MatchStoreService
+from services.rate_limit_service import Priority, TokenBucketLimiter, backoff_delay, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
+# Momento em que foi obtido o dado mais antigo servido do cache de contingência
+# na tarefa atual (cada comando do Discord roda em sua própria tarefa)
+_stale_since: ContextVar[Optional[float]] = ContextVar('leetify_stale_since', default=None)
+
 class LeetifyService:
     '''
     Serviço responsável pela comunicação com a API do Leetify.
+
+    Todas as chamadas são assíncronas e compartilham uma única sessão HTTP
+    com pool de conexões (keep-alive), para não bloquear o event loop do bot.
     '''
-    
-    BASE_URL = "https://api-public.cs-prod.leetify.com"
+
+    # Pode apontar para o mock local (tools/leetify_mock_server.py) via LEETIFY_BASE_URL
+    BASE_URL = os.getenv("LEETIFY_BASE_URL", "https://api-public.cs-prod.leetify.com")
+
+    # Configurações da sessão HTTP (podem ser sobrescritas via ambiente)
+    TIMEOUT = float(os.getenv("LEETIFY_TIMEOUT", "10"))
+    CONNECT_TIMEOUT = float(os.getenv("LEETIFY_CONNECT_TIMEOUT", "5"))
+    MAX_CONNECTIONS = int(os.getenv("LEETIFY_MAX_CONNECTIONS", "20"))
+    MAX_CONNECTIONS_PER_HOST = int(os.getenv("LEETIFY_MAX_CONNECTIONS_PER_HOST", "10"))
+    KEEPALIVE_TIMEOUT = float(os.getenv("LEETIFY_KEEPALIVE_TIMEOUT", "30"))
+
+    # TTL (segundos) do cache de respostas por endpoint
+    CACHE_TTLS = {
+        'matches': float(os.getenv("LEETIFY_CACHE_TTL_MATCHES", "120")),
+        'profile': float(os.getenv("LEETIFY_CACHE_TTL_PROFILE", "600")),
+    }
+    CACHE_MAX_SIZE = int(os.getenv("LEETIFY_CACHE_MAX_SIZE", "2048"))
+
+    # Projeção aplicada logo após a decodificação, antes de qualquer cache
+    PROJECTIONS = {
+        'matches': JsonService.project_matches,
+        'match': JsonService.project_match,
+    }
+
+    _session: Optional[aiohttp.ClientSession] = None
+    cache = TTLCache(maxsize=CACHE_MAX_SIZE)
+
+    # Limite de taxa e novas tentativas (429/5xx)
+    RATE_LIMIT = float(os.getenv("LEETIFY_RATE_LIMIT", "4"))
+    RATE_BURST = int(os.getenv("LEETIFY_RATE_BURST", "10"))
+    MAX_RETRIES = int(os.getenv("LEETIFY_MAX_RETRIES", "3"))
+    BACKOFF_BASE = float(os.getenv("LEETIFY_BACKOFF_BASE", "1"))
+    BACKOFF_MAX = float(os.getenv("LEETIFY_BACKOFF_MAX", "30"))
+
+    rate_limiter = TokenBucketLimiter(rate=RATE_LIMIT, capacity=RATE_BURST)
+
+    # Requisições em andamento, compartilhadas entre chamadas idênticas
+    _inflight: dict = {}
+    coalesced_requests = 0
+
+    # Último corpo válido recebido por URL, com validadores (ETag / Last-Modified).
+    # Serve requisições condicionais e, com o circuito aberto, respostas em contingência.
+    LAST_GOOD_MAX_SIZE = int(os.getenv("LEETIFY_LAST_GOOD_MAX_SIZE", "4096"))
+    STALE_MAX_AGE = float(os.getenv("LEETIFY_STALE_MAX_AGE", str(24 * 3600)))
+    _last_good = TTLCache(maxsize=LAST_GOOD_MAX_SIZE, default_ttl=STALE_MAX_AGE)
+    not_modified_responses = 0
+    stale_responses = 0
+
+    # Circuit breaker: falha rápido quando o Leetify está fora do ar
+    BREAKER_THRESHOLD = int(os.getenv("LEETIFY_BREAKER_THRESHOLD", "5"))
+    BREAKER_RESET_TIMEOUT = float(os.getenv("LEETIFY_BREAKER_RESET_TIMEOUT", "30"))
+    circuit_breaker = CircuitBreaker('Leetify', BREAKER_THRESHOLD, BREAKER_RESET_TIMEOUT)
+    _background_tasks: set = set()
 
     @staticmethod
     def get_headers() -> dict:
@@ -26,87 +94,500 @@ class LeetifyService:
         return {"_leetify_key": token}
 
     @staticmethod
-    def get_recent_matches(steam_id: str) -> list:
+    def get_session() -> aiohttp.ClientSession:
+        '''
+        Retorna a sessão HTTP compartilhada, criando-a na primeira chamada.
+
+        Deve ser chamado de dentro do event loop.
+
+        Returns:
+            aiohttp.ClientSession: Sessão com pool de conexões e keep-alive.
+        '''
+        if LeetifyService._session is None or LeetifyService._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=LeetifyService.MAX_CONNECTIONS,
+                limit_per_host=LeetifyService.MAX_CONNECTIONS_PER_HOST,
+                keepalive_timeout=LeetifyService.KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=300
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=LeetifyService.TIMEOUT,
+                connect=LeetifyService.CONNECT_TIMEOUT
+            )
+            LeetifyService._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return LeetifyService._session
+
+    @staticmethod
+    async def close():
+        '''
+        Fecha a sessão HTTP compartilhada, liberando as conexões do pool.
+        '''
+        if LeetifyService._session is not None and not LeetifyService._session.closed:
+            await LeetifyService._session.close()
+        LeetifyService._session = None
+
+    @staticmethod
+    def set_cache(cache):
+        '''
+        Substitui o backend de cache usado pelas respostas da API.
+
+        Args:
+            cache: Objeto com a interface de TTLCache (get, set, invalidate, clear, stats).
+        '''
+        LeetifyService.cache = cache
+
+    @staticmethod
+    def set_rate_share(share: float):
+        '''
+        Ajusta o limitador para uma fração de LEETIFY_RATE_LIMIT.
+
+        Com os workers de polling cada processo tem o próprio limitador; o
+        limite da API é dividido entre eles.
+
+        Args:
+            share (float): Fração do limite deste processo (0 < share <= 1).
+        '''
+        rate = LeetifyService.RATE_LIMIT * share
+        capacity = max(1, int(LeetifyService.RATE_BURST * share))
+        limiter = LeetifyService.rate_limiter
+        if rate != limiter.rate or capacity != limiter.capacity:
+            limiter.set_rate(rate, capacity)
+            logger.info(f"Limite do Leetify deste processo: {rate:.2f} req/s (rajada {capacity})")
+
+    @staticmethod
+    def invalidate_player(steam_id: str):
+        '''
+        Descarta as respostas em cache de um jogador (perfil e lista de partidas).
+
+        Args:
+            steam_id (str): Steam ID 64 do jogador.
+        '''
+        LeetifyService.cache.invalidate(('matches', steam_id))
+        LeetifyService.cache.invalidate(('profile', steam_id))
+
+    @staticmethod
+    def cache_stats() -> dict:
+        '''
+        Retorna os contadores de hit/miss do cache de respostas.
+
+        Returns:
+            dict: Estatísticas do cache.
+        '''
+        return LeetifyService.cache.stats()
+
+    @staticmethod
+    async def _get_cached_json(endpoint: str, key: str, url: str, params: dict = None, context: str = "",
+                               priority: Priority = Priority.INTERACTIVE) -> Optional[Any]:
+        '''
+        Executa um GET passando antes pelo cache do endpoint.
+
+        Apenas respostas bem-sucedidas são armazenadas. Se o circuito estiver
+        aberto, ou a chamada falhar, devolve o último dado válido conhecido
+        (stale-while-revalidate) e dispara a revalidação em segundo plano.
+
+        Args:
+            endpoint (str): Nome do endpoint, usado na chave e no TTL.
+            key (str): Identificador do recurso (ex.: Steam ID).
+            url (str): URL completa do endpoint.
+            params (dict): Parâmetros de query string.
+            context (str): Descrição da chamada, usada nos logs de erro.
+            priority (Priority): Fila do limitador de taxa.
+
+        Returns:
+            Any: JSON decodificado ou None em caso de erro.
+        '''
+        data = LeetifyService.cache.get((endpoint, key))
+        if data is not None:
+            return data
+
+        request_key = LeetifyService._request_key(url, params)
+        if not LeetifyService.circuit_breaker.is_closed():
+            stale = LeetifyService._serve_stale(request_key)
+            if stale is not None:
+                task = asyncio.ensure_future(
+                    LeetifyService._refresh_cached_json(endpoint, key, url, params, context, Priority.BACKGROUND)
+                )
+                LeetifyService._background_tasks.add(task)
+                task.add_done_callback(LeetifyService._background_tasks.discard)
+                return stale
+
+        data = await LeetifyService._refresh_cached_json(endpoint, key, url, params, context, priority)
+        if data is not None:
+            return data
+        return LeetifyService._serve_stale(request_key)
+
+    @staticmethod
+    async def _refresh_cached_json(endpoint: str, key: str, url: str, params: dict, context: str,
+                                   priority: Priority) -> Optional[Any]:
+        '''
+        Busca o recurso na API e, em caso de sucesso, atualiza o cache do endpoint.
+        '''
+        data = await LeetifyService._get_json(
+            url, params, context, priority, conditional=True, project=LeetifyService.PROJECTIONS.get(endpoint)
+        )
+        if data is not None:
+            LeetifyService.cache.set((endpoint, key), data, ttl=LeetifyService.CACHE_TTLS.get(endpoint))
+        return data
+
+    @staticmethod
+    def _serve_stale(request_key: tuple) -> Optional[Any]:
+        '''
+        Recupera o último dado válido de uma URL e marca a tarefa atual como servida do cache.
+        '''
+        entry = LeetifyService._last_good.get(request_key)
+        if entry is None:
+            return None
+
+        LeetifyService.stale_responses += 1
+        since = _stale_since.get()
+        if since is None or entry['fetched_at'] < since:
+            _stale_since.set(entry['fetched_at'])
+        return entry['data']
+
+    @staticmethod
+    def stale_data_age() -> Optional[float]:
+        '''
+        Idade do dado mais antigo servido em contingência na tarefa atual.
+
+        Returns:
+            float: Idade em segundos ou None se todos os dados vieram frescos.
+        '''
+        since = _stale_since.get()
+        return time.time() - since if since is not None else None
+
+    @staticmethod
+    async def _single_flight(key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        '''
+        Garante que apenas uma operação por chave esteja em andamento.
+
+        Chamadas concorrentes com a mesma chave aguardam o resultado da
+        primeira em vez de disparar uma nova requisição. O cancelamento de um
+        dos chamadores não cancela a operação compartilhada.
+
+        Args:
+            key: Identificador da operação (endpoint + parâmetros + fila do limitador).
+            factory: Função que cria a corrotina a ser executada.
+
+        Returns:
+            Any: Resultado da operação compartilhada.
+        '''
+        task = LeetifyService._inflight.get(key)
+        if task is not None:
+            LeetifyService.coalesced_requests += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(factory())
+        LeetifyService._inflight[key] = task
+        task.add_done_callback(lambda _: LeetifyService._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def coalescing_stats() -> dict:
+        '''
+        Retorna quantas chamadas foram atendidas por uma requisição já em andamento.
+
+        Returns:
+            dict: Chamadas coalescidas e requisições em andamento.
+        '''
+        return {
+            'coalesced': LeetifyService.coalesced_requests,
+            'inflight': len(LeetifyService._inflight)
+        }
+
+    @staticmethod
+    def conditional_stats() -> dict:
+        '''
+        Retorna quantas requisições condicionais foram respondidas com 304.
+
+        Returns:
+            dict: Respostas 304 e validadores armazenados.
+        '''
+        return {
+            'not_modified': LeetifyService.not_modified_responses,
+            'stored': len(LeetifyService._last_good)
+        }
+
+    @staticmethod
+    def breaker_stats() -> dict:
+        '''
+        Retorna o estado do circuit breaker e quantas respostas vieram da contingência.
+        '''
+        return {**LeetifyService.circuit_breaker.stats(), 'stale_responses': LeetifyService.stale_responses}
+
+    @staticmethod
+    def _request_key(url: str, params: dict = None) -> tuple:
+        return (url, tuple(sorted((params or {}).items())))
+
+    @staticmethod
+    async def _get_json(url: str, params: dict = None, context: str = "",
+                        priority: Priority = Priority.INTERACTIVE, conditional: bool = False,
+                        project: Callable[[Any], Any] = None) -> Optional[Any]:
+        '''
+        Executa um GET na API e retorna apenas o JSON decodificado.
+
+        Returns:
+            Any: JSON decodificado ou None em caso de erro.
+        '''
+        data, _ = await LeetifyService._request(url, params, context, priority, conditional, project)
+        return data
+
+    @staticmethod
+    async def _request(url: str, params: dict = None, context: str = "",
+                       priority: Priority = Priority.INTERACTIVE, conditional: bool = False,
+                       project: Callable[[Any], Any] = None) -> Tuple[Optional[Any], bool]:
+        '''
+        Executa um GET na API, compartilhando requisições idênticas simultâneas.
+
+        Args:
+            url (str): URL completa do endpoint.
+            params (dict): Parâmetros de query string.
+            context (str): Descrição da chamada, usada nos logs de erro.
+            priority (Priority): Fila do limitador de taxa.
+            conditional (bool): Envia If-None-Match/If-Modified-Since quando houver validadores.
+            project (Callable): Projeção aplicada ao JSON decodificado.
+
+        Returns:
+            Tuple[Any, bool]: JSON decodificado (ou None em caso de erro) e se o conteúdo mudou.
+        '''
+        # A fila faz parte da chave: um comando interativo não espera na fila BACKGROUND
+        # de uma requisição do poller já em andamento
+        key = (LeetifyService._request_key(url, params), priority)
+        return await LeetifyService._single_flight(
+            key, lambda: LeetifyService._fetch_json(url, params, context, priority, conditional, project)
+        )
+
+    @staticmethod
+    async def _fetch_json(url: str, params: dict = None, context: str = "",
+                          priority: Priority = Priority.INTERACTIVE, conditional: bool = False,
+                          project: Callable[[Any], Any] = None) -> Tuple[Optional[Any], bool]:
+        '''
+        Executa um GET na API e decodifica o JSON da resposta.
+
+        Cada tentativa passa pelo limitador de taxa. Respostas 429 e 5xx são
+        repetidas com backoff exponencial com jitter, respeitando o
+        Retry-After quando enviado (um 429 pausa todas as filas).
+
+        Em requisições condicionais, um 304 reaproveita o último corpo recebido
+        sem decodificar JSON novamente. O corpo é decodificado pelo
+        JsonService (orjson quando instalado) e projetado antes de ser
+        compartilhado ou armazenado.
+
+        Args:
+            url (str): URL completa do endpoint.
+            params (dict): Parâmetros de query string.
+            context (str): Descrição da chamada, usada nos logs de erro.
+            priority (Priority): Fila do limitador de taxa.
+            conditional (bool): Usa e armazena validadores ETag/Last-Modified.
+            project (Callable): Projeção aplicada ao JSON decodificado.
+
+        Returns:
+            Tuple[Any, bool]: JSON decodificado (ou None em caso de erro) e se o conteúdo mudou.
+        '''
+        key = LeetifyService._request_key(url, params)
+        headers = LeetifyService.get_headers()
+        last_good = LeetifyService._last_good.get(key) if conditional else None
+        if last_good:
+            if last_good.get('etag'):
+                headers['If-None-Match'] = last_good['etag']
+            if last_good.get('last_modified'):
+                headers['If-Modified-Since'] = last_good['last_modified']
+
+        breaker = LeetifyService.circuit_breaker
+        session = LeetifyService.get_session()
+        for attempt in range(LeetifyService.MAX_RETRIES + 1):
+            if not breaker.allow_request():
+                logger.debug(f"Circuito aberto, chamada ao Leetify ignorada ({context})")
+                return None, False
+
+            await LeetifyService.rate_limiter.acquire(priority)
+            retry_after = None
+            try:
+                async with session.get(url, headers=headers, params=params) as response:
+                    if response.status == 304 and last_good:
+                        breaker.record_success()
+                        LeetifyService.not_modified_responses += 1
+                        LeetifyService._store_last_good(key, response.headers, last_good['data'], last_good)
+                        return last_good['data'], False
+
+                    if response.status == 200:
+                        data = JsonService.loads(await response.read())
+                        if project is not None:
+                            data = project(data)
+                        breaker.record_success()
+                        if conditional:
+                            LeetifyService._store_last_good(key, response.headers, data)
+                        return data, True
+
+                    if response.status != 429 and response.status < 500:
+                        # O serviço está respondendo; erro do lado do cliente
+                        breaker.record_success()
+                        body = await response.text()
+                        logger.error(f"Erro na API Leetify ({context}): {response.status} - {body[:200]}")
+                        return None, False
+
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if response.status == 429:
+                        breaker.record_success()
+                        LeetifyService.rate_limiter.pause(
+                            retry_after if retry_after is not None else LeetifyService.BACKOFF_BASE
+                        )
+                    else:
+                        breaker.record_failure()
+                    error = f"HTTP {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                breaker.record_failure()
+                error = repr(e)
+            except Exception as e:
+                breaker.record_failure()
+                logger.error(f"Erro ao acessar API Leetify ({context}): {e!r}")
+                return None, False
+
+            if attempt == LeetifyService.MAX_RETRIES:
+                logger.error(f"Erro na API Leetify ({context}): {error} após {attempt + 1} tentativas")
+                return None, False
+
+            delay = retry_after if retry_after is not None else backoff_delay(
+                attempt, LeetifyService.BACKOFF_BASE, LeetifyService.BACKOFF_MAX
+            )
+            logger.warning(f"API Leetify ({context}): {error}, nova tentativa em {delay:.1f}s")
+            await asyncio.sleep(delay)
+        return None, False
+
+    @staticmethod
+    def _store_last_good(key: tuple, response_headers, data: Any, previous: dict = None):
+        '''
+        Guarda o corpo decodificado e os validadores ETag/Last-Modified da resposta.
+
+        Em um 304 os validadores anteriores são mantidos caso a resposta não os repita.
+        '''
+        previous = previous or {}
+        LeetifyService._last_good.set(key, {
+            'etag': response_headers.get('ETag') or previous.get('etag'),
+            'last_modified': response_headers.get('Last-Modified') or previous.get('last_modified'),
+            'data': data,
+            'fetched_at': time.time()
+        })
+
+    @staticmethod
+    async def get_recent_matches(steam_id: str, priority: Priority = Priority.INTERACTIVE) -> list:
         '''
         Busca os jogos recentes de um usuário usando a API v3/profile/matches.
 
+        As partidas retornadas também são registradas no MatchHistoryService.
+
         Args:
             steam_id (str): Steam ID 64 do usuário.
+            priority (Priority): Fila do limitador (BACKGROUND para tarefas periódicas).
 
         Returns:
             list: Lista de jogos recentes ou lista vazia em caso de erro.
         '''
         url = f"{LeetifyService.BASE_URL}/v3/profile/matches"
         params = {"steam64_id": steam_id}
-        try:
-            response = requests.get(url, headers=LeetifyService.get_headers(), params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                # A API v3 retorna uma lista diretamente
-                return data if isinstance(data, list) else []
-            else:
-                logger.error(f"Erro na API Leetify: {response.status_code} - {response.text}")
-                return []
-        except Exception as e:
-            logger.error(f"Erro ao buscar partidas no Leetify: {e}")
+        data = await LeetifyService._get_cached_json('matches', steam_id, url, params, f"partidas de {steam_id}", priority)
+        # A API v3 retorna uma lista diretamente
+        if not isinstance(data, list):
             return []
-    
+
+        await asyncio.to_thread(MatchHistoryService.record_matches, data, steam_id)
+        return data
+
+    @staticmethod
+    async def poll_recent_matches(steam_id: str, priority: Priority = Priority.BACKGROUND) -> Tuple[list, bool]:
+        '''
+        Consulta a lista de partidas ignorando o cache, via requisição condicional.
+
+        Usado pelo poller: quando a API responde 304 a lista anterior é
+        reaproveitada e o resultado é marcado como inalterado, permitindo
+        pular o processamento. O cache de respostas é atualizado.
+
+        Args:
+            steam_id (str): Steam ID 64 do usuário.
+            priority (Priority): Fila do limitador.
+
+        Returns:
+            Tuple[list, bool]: Lista de partidas e se ela mudou desde a última consulta.
+        '''
+        url = f"{LeetifyService.BASE_URL}/v3/profile/matches"
+        params = {"steam64_id": steam_id}
+        data, changed = await LeetifyService._request(
+            url, params, f"partidas de {steam_id}", priority, conditional=True,
+            project=LeetifyService.PROJECTIONS['matches']
+        )
+        if not isinstance(data, list):
+            return [], False
+
+        LeetifyService.cache.set(('matches', steam_id), data, ttl=LeetifyService.CACHE_TTLS['matches'])
+        if changed:
+            await asyncio.to_thread(MatchHistoryService.record_matches, data, steam_id)
+        return data, changed
+
     @staticmethod
-    def get_player_stats(steam_id: str):
+    async def get_player_stats(steam_id: str):
         '''
         Busca estatísticas gerais do jogador usando os matches recentes.
-        
+
         Args:
             steam_id (str): Steam ID 64 do usuário.
-            
+
         Returns:
             list: Lista de matches do jogador.
         '''
-        return LeetifyService.get_recent_matches(steam_id)
-    
+        return await LeetifyService.get_recent_matches(steam_id)
+
     @staticmethod
-    def get_match_details(match_id: str) -> dict:
+    async def get_match_details(match_id: str, priority: Priority = Priority.INTERACTIVE) -> dict:
         '''
         Busca detalhes de uma partida específica usando o ID da partida.
-        
+
+        Partidas finalizadas são imutáveis: após o primeiro download ficam no
+        MatchStoreService e consultas seguintes não acessam a rede.
+
         Args:
             match_id (str): ID da partida retornado pela API.
-            
+            priority (Priority): Fila do limitador (BACKGROUND para tarefas periódicas).
+
         Returns:
             dict: Detalhes da partida ou dicionário vazio em caso de erro.
         '''
+        return await LeetifyService._single_flight(
+            ('match', match_id, priority), lambda: LeetifyService._load_match_details(match_id, priority)
+        )
+
+    @staticmethod
+    async def _load_match_details(match_id: str, priority: Priority) -> dict:
+        '''
+        Carrega os detalhes da partida do disco ou, se necessário, da API.
+        '''
+        stored = await asyncio.to_thread(MatchStoreService.get_match, match_id)
+        if stored:
+            return stored
+
         url = f"{LeetifyService.BASE_URL}/v2/matches/{match_id}"
-        try:
-            response = requests.get(url, headers=LeetifyService.get_headers(), timeout=10)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"Erro ao buscar partida {match_id}: {response.status_code}")
-                return {}
-        except Exception as e:
-            logger.error(f"Erro ao buscar detalhes da partida: {e}")
+        data = await LeetifyService._get_json(url, context=f"partida {match_id}", priority=priority)
+        if not isinstance(data, dict):
             return {}
-    
+
+        # O disco guarda o payload completo; a projeção é aplicada na leitura
+        match = LeetifyService.PROJECTIONS['match'](data)
+        if 'stats' in match:
+            await asyncio.to_thread(MatchStoreService.save_match, data)
+            await asyncio.to_thread(MatchHistoryService.record_matches, [match])
+        return match
+
     @staticmethod
-    def get_user_profile(steam_id: str) -> dict:
+    async def get_user_profile(steam_id: str, priority: Priority = Priority.INTERACTIVE) -> dict:
         '''
         Busca perfil completo do usuário com ranks, stats gerais e recent_teammates.
-        
+
         Args:
             steam_id (str): Steam ID 64 do usuário.
-            
+            priority (Priority): Fila do limitador (BACKGROUND para tarefas periódicas).
+
         Returns:
             dict: Dados completos do perfil ou dicionário vazio em caso de erro.
         '''
         url = f"{LeetifyService.BASE_URL}/v3/profile"
         params = {"steam64_id": steam_id}
-        try:
-            response = requests.get(url, headers=LeetifyService.get_headers(), params=params, timeout=10)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"Erro ao buscar perfil {steam_id}: {response.status_code}")
-                return {}
-        except Exception as e:
-            logger.error(f"Erro ao buscar perfil do usuário: {e}")
-            return {}
+        data = await LeetifyService._get_cached_json('profile', steam_id, url, params, f"perfil {steam_id}", priority)
+        return data if isinstance(data, dict) else {}
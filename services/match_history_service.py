@@ -0,0 +1,327 @@
+import bisect
+import functools
+import os
+import threading
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from services.json_service import JsonService, Match
+from services.stats_service import StatsService
+
+logger = logging.getLogger(__name__)
+
+class MatchHistoryService:
+    '''
+    Histórico local e permanente das partidas de cada jogador.
+
+    Toda lista de partidas obtida da API (poller ou comandos) é registrada
+    aqui. O arquivo é append-only (JSON Lines, uma partida por linha, gravada
+    uma única vez) e, ao carregar, são montados índices por Steam ID, por mapa
+    e por horário de término. Os comandos de estatística leem daqui, sem
+    chamadas à API e sem o limite de partidas do endpoint.
+    '''
+
+    HISTORY_FILE = 'data/history/matches.jsonl'
+    # Steam IDs cuja própria lista de partidas já foi registrada (um por linha)
+    OWNERS_FILE = 'data/history/players.txt'
+
+    _matches: Optional[Dict[str, dict]] = None
+    # Posição do arquivo já lida; refresh() continua dali
+    _offset = 0
+    # steam_id -> [(finished_ts, match_id)] em ordem crescente de término
+    _by_player: Dict[str, List[Tuple[float, str]]] = {}
+    # map_name -> {match_id}
+    _by_map: Dict[str, Set[str]] = {}
+    # Match IDs na ordem em que entraram no histórico
+    _order: List[str] = []
+    # Jogadores com a própria lista registrada; os demais só aparecem como
+    # companheiros ou adversários e ainda precisam da busca na API
+    _owners: Set[str] = set()
+    _owners_offset = 0
+    # Acesso também a partir de threads (asyncio.to_thread)
+    _lock = threading.RLock()
+
+    @staticmethod
+    def match_timestamp(match: dict) -> float:
+        '''
+        Converte o horário de término da partida (ISO 8601) em epoch.
+        '''
+        value = match.get('finished_at') or match.get('game_finished_at')
+        if not value:
+            return 0.0
+        return MatchHistoryService._parse_timestamp(str(value))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=65536)
+    def _parse_timestamp(value: str) -> float:
+        # A mesma partida é convertida para cada jogador cadastrado nela
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return 0.0
+
+    @staticmethod
+    def _load() -> Dict[str, dict]:
+        '''
+        Carrega o histórico e monta os índices (uma única vez por processo).
+        '''
+        if MatchHistoryService._matches is not None:
+            return MatchHistoryService._matches
+
+        with MatchHistoryService._lock:
+            if MatchHistoryService._matches is not None:
+                return MatchHistoryService._matches
+
+            MatchHistoryService._matches = {}
+            MatchHistoryService._by_player = {}
+            MatchHistoryService._by_map = {}
+            MatchHistoryService._order = []
+            MatchHistoryService._offset = 0
+            MatchHistoryService._owners = set()
+            MatchHistoryService._owners_offset = 0
+            MatchHistoryService._read_new_lines()
+            MatchHistoryService._read_new_owners()
+            return MatchHistoryService._matches
+
+    @staticmethod
+    def _read_new_lines() -> int:
+        '''
+        Indexa as linhas completas gravadas após a última leitura.
+
+        Returns:
+            int: Quantidade de partidas novas indexadas.
+        '''
+        if not os.path.exists(MatchHistoryService.HISTORY_FILE):
+            return 0
+
+        added = 0
+        try:
+            with open(MatchHistoryService.HISTORY_FILE, 'rb') as f:
+                f.seek(MatchHistoryService._offset)
+                data = f.read()
+        except Exception as e:
+            logger.error(f"Erro ao carregar histórico de partidas: {e}")
+            return 0
+
+        # Uma linha sem quebra no final ainda está sendo gravada por outro processo
+        complete = data[:data.rfind(b'\n') + 1]
+        MatchHistoryService._offset += len(complete)
+        for line in complete.splitlines():
+            try:
+                if MatchHistoryService._index(JsonService.as_match(JsonService.loads(line))):
+                    added += 1
+            except (ValueError, TypeError):
+                # Linha truncada por uma queda no meio da escrita
+                continue
+        return added
+
+    @staticmethod
+    def _read_new_owners():
+        '''
+        Incorpora os jogadores registrados em OWNERS_FILE após a última leitura.
+        '''
+        if not os.path.exists(MatchHistoryService.OWNERS_FILE):
+            return
+
+        try:
+            with open(MatchHistoryService.OWNERS_FILE, 'rb') as f:
+                f.seek(MatchHistoryService._owners_offset)
+                data = f.read()
+        except Exception as e:
+            logger.error(f"Erro ao carregar jogadores do histórico: {e}")
+            return
+
+        complete = data[:data.rfind(b'\n') + 1]
+        MatchHistoryService._owners_offset += len(complete)
+        MatchHistoryService._owners.update(line.decode('utf-8') for line in complete.splitlines() if line)
+
+    @staticmethod
+    def refresh() -> int:
+        '''
+        Incorpora partidas gravadas por outros processos (workers de polling).
+
+        Returns:
+            int: Quantidade de partidas novas indexadas.
+        '''
+        MatchHistoryService._load()
+        with MatchHistoryService._lock:
+            MatchHistoryService._read_new_owners()
+            return MatchHistoryService._read_new_lines()
+
+    @staticmethod
+    def _index(match: dict) -> bool:
+        '''
+        Adiciona uma partida aos índices em memória.
+
+        Returns:
+            bool: True se a partida ainda não estava no histórico.
+        '''
+        match_id = match.get('id') if isinstance(match, Match) else None
+        if not match_id or match_id in MatchHistoryService._matches:
+            return False
+
+        MatchHistoryService._matches[match_id] = match
+        entry = (MatchHistoryService.match_timestamp(match), match_id)
+        for steam_id in StatsService.match_players(match):
+            bisect.insort(MatchHistoryService._by_player.setdefault(steam_id, []), entry)
+        MatchHistoryService._by_map.setdefault(match.get('map_name') or 'unknown', set()).add(match_id)
+        MatchHistoryService._order.append(match_id)
+        return True
+
+    @staticmethod
+    def record_matches(matches: List[dict], owner: Optional[str] = None) -> int:
+        '''
+        Registra partidas ainda desconhecidas no histórico.
+
+        Args:
+            matches (list): Partidas (já projetadas) vindas da API.
+            owner (str): Steam ID dono da lista, quando matches é a lista de partidas dele.
+
+        Returns:
+            int: Quantidade de partidas novas gravadas.
+        '''
+        MatchHistoryService._load()
+        with MatchHistoryService._lock:
+            new_matches = [
+                m for m in map(JsonService.as_match, matches or [])
+                if isinstance(m, Match) and m.get('stats') and MatchHistoryService._index(m)
+            ]
+
+            try:
+                os.makedirs(os.path.dirname(MatchHistoryService.HISTORY_FILE), exist_ok=True)
+                if new_matches:
+                    with open(MatchHistoryService.HISTORY_FILE, 'ab') as f:
+                        f.write(b''.join(JsonService.dumps(m) + b'\n' for m in new_matches))
+                if owner and owner not in MatchHistoryService._owners:
+                    with open(MatchHistoryService.OWNERS_FILE, 'a') as f:
+                        f.write(f"{owner}\n")
+                    MatchHistoryService._owners.add(owner)
+            except Exception as e:
+                logger.error(f"Erro ao gravar histórico de partidas: {e}")
+        return len(new_matches)
+
+    @staticmethod
+    def has_player(steam_id: str) -> bool:
+        '''
+        Verifica se a própria lista de partidas do jogador já foi registrada.
+
+        Aparecer apenas como companheiro ou adversário em partidas de outros
+        cadastrados não conta: o histórico dele ainda estaria incompleto.
+        '''
+        MatchHistoryService._load()
+        return steam_id in MatchHistoryService._owners
+
+    @staticmethod
+    def get_match(match_id: str) -> Optional[dict]:
+        '''
+        Recupera uma partida do histórico pelo ID.
+        '''
+        return MatchHistoryService._load().get(match_id)
+
+    @staticmethod
+    def get_player_entries(steam_id: str, start: int = 0) -> List[Tuple[float, str]]:
+        '''
+        Retorna as entradas (término, match_id) do jogador a partir da posição
+        start, em ordem cronológica.
+        '''
+        MatchHistoryService._load()
+        with MatchHistoryService._lock:
+            return MatchHistoryService._by_player.get(steam_id, [])[start:]
+
+    @staticmethod
+    def player_match_count(steam_id: str) -> int:
+        '''
+        Quantidade de partidas do jogador no histórico.
+        '''
+        MatchHistoryService._load()
+        return len(MatchHistoryService._by_player.get(steam_id, ()))
+
+    @staticmethod
+    def get_matches_from(start: int = 0) -> List[dict]:
+        '''
+        Retorna as partidas a partir da posição start, na ordem em que
+        entraram no histórico (para consumidores incrementais).
+        '''
+        matches = MatchHistoryService._load()
+        with MatchHistoryService._lock:
+            return [matches[match_id] for match_id in MatchHistoryService._order[start:]]
+
+    @staticmethod
+    def last_match_time(steam_id: str) -> Optional[float]:
+        '''
+        Retorna o horário de término (epoch) da partida mais recente do jogador.
+        '''
+        MatchHistoryService._load()
+        with MatchHistoryService._lock:
+            entries = MatchHistoryService._by_player.get(steam_id)
+            return entries[-1][0] if entries else None
+
+    @staticmethod
+    def get_player_matches(steam_id: str, limit: Optional[int] = None, since: Optional[float] = None,
+                           map_name: Optional[str] = None) -> List[dict]:
+        '''
+        Lista as partidas de um jogador, da mais recente para a mais antiga.
+
+        Args:
+            steam_id (str): Steam ID 64 do jogador.
+            limit (int): Máximo de partidas retornadas (None = todas).
+            since (float): Apenas partidas terminadas a partir deste epoch.
+            map_name (str): Filtra por mapa (ex.: de_mirage).
+
+        Returns:
+            list: Partidas no mesmo formato de get_recent_matches.
+        '''
+        matches = MatchHistoryService._load()
+        with MatchHistoryService._lock:
+            entries = MatchHistoryService._by_player.get(steam_id, [])
+            start = bisect.bisect_left(entries, (since, '')) if since is not None else 0
+            map_ids = MatchHistoryService._by_map.get(map_name, set()) if map_name else None
+
+            result = []
+            for _, match_id in reversed(entries[start:]):
+                if map_ids is not None and match_id not in map_ids:
+                    continue
+                result.append(matches[match_id])
+                if limit is not None and len(result) >= limit:
+                    break
+            return result
+
+    @staticmethod
+    def parse_window(window: Optional[str], default_limit: int = 10) -> Tuple[Optional[int], Optional[float], str]:
+        '''
+        Interpreta a janela informada nos comandos de estatística.
+
+        Aceita um número (últimas N partidas), "hoje", "semana", "mes" ou "tudo".
+
+        Returns:
+            Tuple: (limite, epoch inicial, descrição da janela).
+        '''
+        value = (window or '').strip().lower()
+        if not value:
+            return default_limit, None, f"últimas {default_limit} partidas"
+        if value.isdigit():
+            limit = max(1, int(value))
+            return limit, None, f"últimas {limit} partidas"
+
+        now = datetime.now(timezone.utc)
+        if value == 'hoje':
+            return None, now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp(), "hoje"
+        if value == 'semana':
+            return None, (now - timedelta(days=7)).timestamp(), "últimos 7 dias"
+        if value in ('mes', 'mês'):
+            return None, now.replace(day=1, hour=0, minute=0, second=0, microsecond=0).timestamp(), "este mês"
+        if value == 'tudo':
+            return None, None, "todo o histórico"
+        raise ValueError(f"Janela inválida: {window}")
+
+    @staticmethod
+    def stats() -> dict:
+        '''
+        Retorna o tamanho do histórico e dos índices.
+        '''
+        matches = MatchHistoryService._load()
+        return {
+            'matches': len(matches),
+            'players': len(MatchHistoryService._by_player),
+            'maps': len(MatchHistoryService._by_map)
+        }
@@ -0,0 +1,178 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import logging
+from typing import Optional
+from services.json_service import JsonService
+
+logger = logging.getLogger(__name__)
+
+class MatchStoreService:
+    '''
+    Armazenamento permanente em disco dos detalhes de partidas.
+
+    Uma partida finalizada nunca muda, então cada payload é gravado uma única
+    vez, comprimido, em um arquivo endereçado pelo hash do Match ID. Um índice
+    append-only (JSON Lines) registra o que já está armazenado; uma consulta
+    que não encontra a partida relê o final do índice, onde os workers de
+    polling (outros processos) podem ter registrado partidas novas.
+    '''
+
+    DATA_DIR = 'data/matches'
+    INDEX_FILE = 'data/matches/index.jsonl'
+
+    _index: Optional[dict] = None
+    # Posição do índice já lida
+    _offset = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _digest(match_id: str) -> str:
+        '''
+        Gera o endereço do arquivo a partir do Match ID.
+
+        O hash evita que IDs vindos de comandos virem caminhos arbitrários.
+        '''
+        return hashlib.sha256(str(match_id).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _relative_path(match_id: str) -> str:
+        digest = MatchStoreService._digest(match_id)
+        return os.path.join(digest[:2], f"{digest}.json.gz")
+
+    @staticmethod
+    def _load_index() -> dict:
+        '''
+        Carrega o índice de partidas armazenadas (uma única vez por processo).
+
+        Returns:
+            dict: Dicionário mapeando Match ID para os metadados do arquivo.
+        '''
+        if MatchStoreService._index is None:
+            with MatchStoreService._lock:
+                if MatchStoreService._index is None:
+                    MatchStoreService._offset = 0
+                    MatchStoreService._index = {}
+                    MatchStoreService._read_new_entries()
+        return MatchStoreService._index
+
+    @staticmethod
+    def _read_new_entries():
+        '''
+        Incorpora as linhas completas do índice gravadas após a última leitura.
+        Deve ser chamado com _lock.
+        '''
+        if not os.path.exists(MatchStoreService.INDEX_FILE):
+            return
+
+        try:
+            with open(MatchStoreService.INDEX_FILE, 'rb') as f:
+                f.seek(MatchStoreService._offset)
+                data = f.read()
+        except Exception as e:
+            logger.error(f"Erro ao carregar índice de partidas: {e}")
+            return
+
+        # Uma linha sem quebra no final ainda está sendo gravada por outro processo
+        complete = data[:data.rfind(b'\n') + 1]
+        MatchStoreService._offset += len(complete)
+        for line in complete.splitlines():
+            try:
+                entry = json.loads(line)
+                MatchStoreService._index[entry['id']] = entry
+            except (ValueError, KeyError):
+                # Linha truncada por uma queda no meio da escrita
+                continue
+
+    @staticmethod
+    def _find(match_id: str) -> Optional[dict]:
+        '''
+        Procura a partida no índice, relendo o final do arquivo quando não encontrada.
+        '''
+        index = MatchStoreService._load_index()
+        entry = index.get(str(match_id))
+        if entry is None:
+            with MatchStoreService._lock:
+                MatchStoreService._read_new_entries()
+            entry = index.get(str(match_id))
+        return entry
+
+    @staticmethod
+    def has_match(match_id: str) -> bool:
+        '''
+        Verifica se a partida já está armazenada em disco.
+        '''
+        return MatchStoreService._find(match_id) is not None
+
+    @staticmethod
+    def get_match(match_id: str) -> Optional[dict]:
+        '''
+        Recupera os detalhes de uma partida armazenada.
+
+        Args:
+            match_id (str): ID da partida.
+
+        Returns:
+            dict: Detalhes da partida ou None se não estiver armazenada.
+        '''
+        entry = MatchStoreService._find(match_id)
+        if not entry:
+            return None
+
+        path = os.path.join(MatchStoreService.DATA_DIR, entry['file'])
+        try:
+            with gzip.open(path, 'rb') as f:
+                return JsonService.project_match(JsonService.loads(f.read()))
+        except Exception as e:
+            logger.error(f"Erro ao ler partida {match_id} do disco: {e}")
+            MatchStoreService._index.pop(str(match_id), None)
+            return None
+
+    @staticmethod
+    def save_match(match: dict):
+        '''
+        Grava os detalhes de uma partida finalizada, se ainda não armazenada.
+
+        Args:
+            match (dict): Payload de detalhes da partida (precisa conter 'id').
+        '''
+        match_id = match.get('id')
+        if not match_id or MatchStoreService.has_match(match_id):
+            return
+
+        relative_path = MatchStoreService._relative_path(match_id)
+        path = os.path.join(MatchStoreService.DATA_DIR, relative_path)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(JsonService.dumps(match))
+            os.replace(tmp_path, path)
+
+            entry = {
+                'id': str(match_id),
+                'file': relative_path,
+                'size': os.path.getsize(path),
+                'map_name': match.get('map_name'),
+                'finished_at': match.get('finished_at'),
+                'stored_at': int(time.time())
+            }
+            with open(MatchStoreService.INDEX_FILE, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+            MatchStoreService._load_index()[str(match_id)] = entry
+        except Exception as e:
+            logger.error(f"Erro ao gravar partida {match_id} em disco: {e}")
+
+    @staticmethod
+    def stats() -> dict:
+        '''
+        Retorna a quantidade de partidas e o espaço ocupado em disco.
+        '''
+        index = MatchStoreService._load_index()
+        return {
+            'matches': len(index),
+            'bytes': sum(e.get('size', 0) for e in index.values())
+        }
@@ -1,47 +1,109 @@
-import json
+import asyncio
 import os
 import logging
+from typing import Dict, List, Optional
+from services.storage_service import StorageService
 
 logger = logging.getLogger(__name__)
 
 class MatchTrackerService:
     '''
     Serviço responsável por rastrear a última partida conhecida de cada usuário.
+
+    Além da última partida, guarda os IDs das SEEN_MAX partidas mais recentes
+    já processadas de cada usuário, para que reordenações na lista da API não
+    gerem notificações duplicadas.
+
+    O estado fica em memória; alterações são marcadas como pendentes e
+    gravadas em lote por flush(), chamado ao fim de cada ciclo do poller ou
+    automaticamente após FLUSH_DELAY segundos sem novas alterações.
     '''
-    
-    DATA_FILE = 'data/last_matches.json'
+
+    TABLE = 'last_matches'
+    SEEN_TABLE = 'seen_matches'
+    FLUSH_DELAY = float(os.getenv("MATCH_TRACKER_FLUSH_DELAY", "5"))
+    SEEN_MAX = int(os.getenv("MATCH_TRACKER_SEEN_MAX", "50"))
+
+    _matches: Optional[Dict[str, str]] = None
+    _dirty: set = set()
+    # Discord ID -> IDs de partidas já processadas, da mais antiga para a mais recente
+    _seen: Optional[Dict[str, List[str]]] = None
+    _dirty_seen: set = set()
+    _flush_handle: Optional[asyncio.TimerHandle] = None
 
     @staticmethod
     def _load_matches() -> dict:
         '''
-        Carrega os últimos IDs de partidas do arquivo JSON.
+        Carrega os últimos IDs de partidas (uma única vez por processo).
 
         Returns:
             dict: Dicionário mapeando Discord ID para Match ID.
         '''
-        if not os.path.exists(MatchTrackerService.DATA_FILE):
-            return {}
-        
-        try:
-            with open(MatchTrackerService.DATA_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Erro ao carregar matches: {e}")
-            return {}
+        if MatchTrackerService._matches is None:
+            MatchTrackerService._matches = dict(StorageService.get_backend().load(MatchTrackerService.TABLE))
+        return MatchTrackerService._matches
 
     @staticmethod
-    def _save_matches(matches: dict):
+    def _load_seen() -> Dict[str, List[str]]:
+        '''
+        Carrega as partidas já processadas de cada usuário (uma única vez por processo).
         '''
-        Salva o dicionário de matches no arquivo JSON.
+        if MatchTrackerService._seen is None:
+            stored = StorageService.get_backend().load(MatchTrackerService.SEEN_TABLE)
+            MatchTrackerService._seen = {
+                discord_id: [m for m in match_ids.split(',') if m] for discord_id, match_ids in stored.items()
+            }
+        return MatchTrackerService._seen
 
-        Args:
-            matches (dict): Os dados a serem salvos.
+    @staticmethod
+    def reload(discord_ids):
         '''
-        try:
-            with open(MatchTrackerService.DATA_FILE, 'w') as f:
-                json.dump(matches, f, indent=4)
-        except Exception as e:
-            logger.error(f"Erro ao salvar matches: {e}")
+        Relê do armazenamento o estado de alguns usuários.
+
+        Usado quando um worker assume usuários que eram de outro processo.
+        Usuários com alterações pendentes não são tocados.
+        '''
+        backend = StorageService.get_backend()
+        matches = MatchTrackerService._load_matches()
+        seen = MatchTrackerService._load_seen()
+        for discord_id in discord_ids:
+            discord_id = str(discord_id)
+            if discord_id not in MatchTrackerService._dirty:
+                match_id = backend.get(MatchTrackerService.TABLE, discord_id)
+                if match_id is None:
+                    matches.pop(discord_id, None)
+                else:
+                    matches[discord_id] = match_id
+            if discord_id not in MatchTrackerService._dirty_seen:
+                match_ids = backend.get(MatchTrackerService.SEEN_TABLE, discord_id)
+                seen[discord_id] = [m for m in (match_ids or '').split(',') if m]
+
+    @staticmethod
+    def is_seen(discord_id: str, match_id: str) -> bool:
+        '''
+        Verifica se a partida já foi processada para o usuário.
+
+        A última partida conhecida conta como vista, o que cobre usuários
+        anteriores ao registro de partidas vistas.
+        '''
+        discord_id = str(discord_id)
+        if MatchTrackerService.get_last_match_id(discord_id) == match_id:
+            return True
+        return match_id in MatchTrackerService._load_seen().get(discord_id, ())
+
+    @staticmethod
+    def mark_seen(discord_id: str, match_id: str):
+        '''
+        Marca a partida como processada para o usuário (pendente até o flush()).
+        '''
+        discord_id = str(discord_id)
+        seen = MatchTrackerService._load_seen().setdefault(discord_id, [])
+        if match_id in seen:
+            return
+        seen.append(match_id)
+        del seen[:-MatchTrackerService.SEEN_MAX]
+        MatchTrackerService._dirty_seen.add(discord_id)
+        MatchTrackerService._schedule_flush()
 
     @staticmethod
     def get_last_match_id(discord_id: str) -> str:
@@ -54,8 +116,7 @@ class MatchTrackerService:
         Returns:
             str: O Match ID ou None se não encontrado.
         '''
-        matches = MatchTrackerService._load_matches()
-        return matches.get(str(discord_id))
+        return MatchTrackerService._load_matches().get(str(discord_id))
 
     @staticmethod
     def update_last_match(discord_id: str, match_id: str):
@@ -66,7 +127,75 @@ class MatchTrackerService:
             discord_id (str): ID do usuário no Discord.
             match_id (str): ID da última partida.
         '''
+        MatchTrackerService.update_many({discord_id: match_id})
+
+    @staticmethod
+    def update_many(updates: Dict[str, str]):
+        '''
+        Atualiza a última partida de vários usuários de uma vez.
+
+        As alterações ficam pendentes até o próximo flush().
+
+        Args:
+            updates (dict): Dicionário mapeando Discord ID para Match ID.
+        '''
         matches = MatchTrackerService._load_matches()
-        matches[str(discord_id)] = match_id
-        MatchTrackerService._save_matches(matches)
-        logger.info(f"Última partida de {discord_id} atualizada para {match_id}")
+        for discord_id, match_id in updates.items():
+            discord_id = str(discord_id)
+            if matches.get(discord_id) != match_id:
+                matches[discord_id] = match_id
+                MatchTrackerService._dirty.add(discord_id)
+                logger.info(f"Última partida de {discord_id} atualizada para {match_id}")
+        MatchTrackerService._schedule_flush()
+
+    @staticmethod
+    def _schedule_flush():
+        '''
+        Agenda um flush após FLUSH_DELAY segundos (debounce). Fora do event
+        loop grava imediatamente.
+        '''
+        if not MatchTrackerService._dirty and not MatchTrackerService._dirty_seen:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            MatchTrackerService.flush()
+            return
+
+        if MatchTrackerService._flush_handle is not None:
+            MatchTrackerService._flush_handle.cancel()
+        MatchTrackerService._flush_handle = loop.call_later(MatchTrackerService.FLUSH_DELAY, MatchTrackerService.flush)
+
+    @staticmethod
+    def flush():
+        '''
+        Grava em uma única operação todas as alterações pendentes.
+        '''
+        if MatchTrackerService._flush_handle is not None:
+            MatchTrackerService._flush_handle.cancel()
+            MatchTrackerService._flush_handle = None
+
+        if MatchTrackerService._dirty:
+            dirty = MatchTrackerService._dirty
+            MatchTrackerService._dirty = set()
+            matches = MatchTrackerService._load_matches()
+            try:
+                StorageService.get_backend().upsert_many(
+                    MatchTrackerService.TABLE, {discord_id: matches[discord_id] for discord_id in dirty}
+                )
+            except Exception as e:
+                # Mantém as alterações pendentes para a próxima tentativa
+                MatchTrackerService._dirty |= dirty
+                logger.error(f"Erro ao gravar últimas partidas: {e}")
+
+        if MatchTrackerService._dirty_seen:
+            dirty_seen = MatchTrackerService._dirty_seen
+            MatchTrackerService._dirty_seen = set()
+            seen = MatchTrackerService._load_seen()
+            try:
+                StorageService.get_backend().upsert_many(
+                    MatchTrackerService.SEEN_TABLE, {discord_id: ','.join(seen[discord_id]) for discord_id in dirty_seen}
+                )
+            except Exception as e:
+                MatchTrackerService._dirty_seen |= dirty_seen
+                logger.error(f"Erro ao gravar partidas vistas: {e}")
@@ -0,0 +1,233 @@
+import asyncio
+import os
+import time
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+from services.json_service import JsonService
+from services.rate_limit_service import backoff_delay
+from services.shard_service import ShardService
+from services.storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+class OutboxService:
+    '''
+    Fila persistente de notificações (outbox).
+
+    O poller apenas enfileira jobs; um worker separado os entrega pelo
+    handler registrado em start(), com novas tentativas (backoff exponencial
+    ou o retry_after da exceção), um intervalo mínimo entre envios no mesmo
+    canal e chave de idempotência: o mesmo job nunca é enfileirado duas vezes.
+    Cada job é gravado no armazenamento antes de enfileirado, então sobrevive
+    a reinícios. Com os workers de polling (ShardService.ENABLED) os jobs são
+    gravados por outros processos e o worker de entrega relê a tabela a cada
+    REFRESH_INTERVAL segundos.
+    '''
+
+    TABLE = 'outbox'
+
+    # Intervalo mínimo (segundos) entre envios no mesmo canal
+    CHANNEL_INTERVAL = float(os.getenv("OUTBOX_CHANNEL_INTERVAL", "1.5"))
+    MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+    BACKOFF_BASE = 2.0
+    BACKOFF_MAX = 300.0
+    # Jobs entregues (ou descartados) são mantidos por este tempo para a idempotência
+    RETENTION = float(os.getenv("OUTBOX_RETENTION", str(7 * 24 * 3600)))
+    REFRESH_INTERVAL = float(os.getenv("OUTBOX_REFRESH_INTERVAL", "5"))
+
+    _jobs: Optional[Dict[str, dict]] = None
+    _handler: Optional[Callable[[dict], Awaitable[None]]] = None
+    _worker: Optional[asyncio.Task] = None
+    _wakeup: Optional[asyncio.Event] = None
+    _channel_ready_at: Dict[str, float] = {}
+    delivered = 0
+    retried = 0
+    failed = 0
+
+    @staticmethod
+    def _load() -> Dict[str, dict]:
+        '''
+        Carrega os jobs do armazenamento (uma única vez por processo).
+        '''
+        if OutboxService._jobs is None:
+            jobs = {}
+            for key, value in StorageService.get_backend().load(OutboxService.TABLE).items():
+                try:
+                    jobs[key] = JsonService.loads(value)
+                except (ValueError, TypeError):
+                    logger.error(f"Job inválido na outbox descartado: {key}")
+            OutboxService._jobs = jobs
+        return OutboxService._jobs
+
+    @staticmethod
+    def _refresh():
+        '''
+        Incorpora jobs gravados por outros processos.
+        '''
+        jobs = OutboxService._load()
+        for key, value in StorageService.get_backend().load(OutboxService.TABLE).items():
+            if key in jobs:
+                continue
+            try:
+                jobs[key] = JsonService.loads(value)
+            except (ValueError, TypeError):
+                logger.error(f"Job inválido na outbox ignorado: {key}")
+
+    @staticmethod
+    def _save(key: str):
+        job = OutboxService._jobs[key]
+        StorageService.get_backend().upsert_many(OutboxService.TABLE, {key: JsonService.dumps(job).decode('utf-8')})
+
+    @staticmethod
+    def enqueue(key: str, channel_id: int, payload: dict) -> bool:
+        '''
+        Enfileira uma notificação.
+
+        Args:
+            key (str): Chave de idempotência (ex.: "match:<id>:<canal>").
+            channel_id (int): Canal de destino; usado para o espaçamento dos envios.
+            payload (dict): Dados repassados ao handler (precisam ser serializáveis em JSON).
+
+        Returns:
+            bool: False se um job com a mesma chave já existia.
+        '''
+        jobs = OutboxService._load()
+        if key in jobs:
+            return False
+
+        now = time.time()
+        job = {
+            'channel_id': channel_id,
+            'payload': payload,
+            'status': 'pending',
+            'attempts': 0,
+            'created_at': now,
+            'next_attempt': now
+        }
+        # A tabela é compartilhada entre processos: a chave pode ter sido gravada por outro.
+        # Gravado antes de entrar em _jobs, para que uma falha de escrita não deixe um job só em memória
+        if not StorageService.get_backend().insert_if_absent(OutboxService.TABLE, key, JsonService.dumps(job).decode('utf-8')):
+            return False
+        jobs[key] = job
+        if OutboxService._wakeup is not None:
+            OutboxService._wakeup.set()
+        return True
+
+    @staticmethod
+    def start(handler: Callable[[dict], Awaitable[None]]):
+        '''
+        Inicia o worker de entrega (idempotente). Deve rodar dentro do event loop.
+
+        Args:
+            handler: Corrotina que recebe o job e faz o envio; exceções geram nova tentativa.
+        '''
+        OutboxService._handler = handler
+        if OutboxService._worker is not None and not OutboxService._worker.done():
+            return
+        OutboxService._load()
+        OutboxService._wakeup = asyncio.Event()
+        OutboxService._worker = asyncio.ensure_future(OutboxService._run())
+
+    @staticmethod
+    def stop():
+        '''
+        Cancela o worker; jobs pendentes continuam gravados.
+        '''
+        if OutboxService._worker is not None:
+            OutboxService._worker.cancel()
+        OutboxService._worker = None
+        OutboxService._wakeup = None
+
+    @staticmethod
+    def _prune(now: float):
+        jobs = OutboxService._jobs
+        expired = [
+            key for key, job in jobs.items()
+            if job['status'] != 'pending' and now - job.get('finished_at', now) > OutboxService.RETENTION
+        ]
+        for key in expired:
+            del jobs[key]
+            StorageService.get_backend().delete(OutboxService.TABLE, key)
+
+    @staticmethod
+    async def _run():
+        while True:
+            try:
+                await OutboxService._run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Ex.: "database is locked"; o worker de entrega não pode morrer
+                logger.error(f"Erro no worker da outbox: {e}")
+                await asyncio.sleep(OutboxService.REFRESH_INTERVAL)
+
+    @staticmethod
+    async def _run_once():
+        now = time.time()
+        OutboxService._prune(now)
+        pending = [(key, job) for key, job in OutboxService._jobs.items() if job['status'] == 'pending']
+        due = sorted(
+            ((key, job) for key, job in pending if job['next_attempt'] <= now),
+            key=lambda item: item[1]['created_at']
+        )
+
+        if not due:
+            timeout = min((job['next_attempt'] for _, job in pending), default=now + 3600) - now
+            if ShardService.ENABLED:
+                timeout = min(timeout, OutboxService.REFRESH_INTERVAL)
+            OutboxService._wakeup.clear()
+            try:
+                await asyncio.wait_for(OutboxService._wakeup.wait(), timeout=max(timeout, 0.1))
+            except asyncio.TimeoutError:
+                pass
+            if ShardService.ENABLED:
+                OutboxService._refresh()
+            return
+
+        for key, job in due:
+            channel = str(job['channel_id'])
+            wait = OutboxService._channel_ready_at.get(channel, 0) - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await OutboxService._deliver(key, job)
+            OutboxService._channel_ready_at[channel] = time.time() + OutboxService.CHANNEL_INTERVAL
+
+    @staticmethod
+    async def _deliver(key: str, job: dict):
+        try:
+            await OutboxService._handler(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job['attempts'] += 1
+            if job['attempts'] >= OutboxService.MAX_ATTEMPTS:
+                job['status'] = 'failed'
+                job['finished_at'] = time.time()
+                OutboxService.failed += 1
+                logger.error(f"Notificação {key} descartada após {job['attempts']} tentativas: {e}")
+            else:
+                # discord.py expõe retry_after em erros de rate limit
+                delay = getattr(e, 'retry_after', None) or backoff_delay(
+                    job['attempts'], OutboxService.BACKOFF_BASE, OutboxService.BACKOFF_MAX
+                )
+                job['next_attempt'] = time.time() + delay
+                OutboxService.retried += 1
+                logger.warning(f"Falha ao entregar notificação {key} (tentativa {job['attempts']}), nova tentativa em {delay:.1f}s: {e}")
+        else:
+            job['status'] = 'delivered'
+            job['finished_at'] = time.time()
+            OutboxService.delivered += 1
+        OutboxService._save(key)
+
+    @staticmethod
+    def stats() -> dict:
+        '''
+        Retorna os contadores da outbox.
+        '''
+        jobs = OutboxService._load()
+        return {
+            'pending': sum(1 for job in jobs.values() if job['status'] == 'pending'),
+            'delivered': OutboxService.delivered,
+            'retried': OutboxService.retried,
+            'failed': OutboxService.failed
+        }
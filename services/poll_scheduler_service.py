@@ -0,0 +1,184 @@
+import os
+import random
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+from services.match_history_service import MatchHistoryService
+
+logger = logging.getLogger(__name__)
+
+class PollSchedulerService:
+    '''
+    Agenda adaptativa do poller: cada usuário tem seu próximo horário de consulta.
+
+    O intervalo depende de quanto tempo faz desde a última partida do jogador
+    (quem está jogando agora é consultado a cada poucos minutos, quem está
+    parado há semanas a cada poucas horas) e dobra no horário de madrugada.
+    Um orçamento global de consultas por hora limita o total de requisições;
+    usuários vencidos que não couberem no orçamento ficam para o próximo tick.
+    '''
+
+    # (idade máxima da última partida em segundos, intervalo entre consultas em segundos)
+    ACTIVITY_TIERS = [
+        (2 * 3600, 5 * 60),         # jogando agora: a cada 5 min
+        (24 * 3600, 20 * 60),       # jogou hoje: a cada 20 min
+        (7 * 24 * 3600, 60 * 60),   # jogou na semana: a cada hora
+    ]
+    # Jogadores parados há mais tempo (ou sem histórico)
+    DORMANT_INTERVAL = float(os.getenv("POLL_DORMANT_INTERVAL", str(6 * 3600)))
+
+    # Horário local (início, fim) em que os intervalos são multiplicados por QUIET_FACTOR
+    QUIET_HOURS = tuple(int(h) for h in os.getenv("POLL_QUIET_HOURS", "3-10").split('-'))
+    QUIET_FACTOR = float(os.getenv("POLL_QUIET_FACTOR", "2"))
+
+    # Variação aleatória do intervalo, para espalhar as consultas
+    JITTER = 0.1
+
+    # Orçamento global de consultas de lista de partidas por hora
+    BUDGET_PER_HOUR = float(os.getenv("POLL_BUDGET_PER_HOUR", "600"))
+    # Máximo acumulado do orçamento (equivale a 10 min de consultas)
+    BUDGET_BURST = BUDGET_PER_HOUR / 6
+
+    _next_poll: Dict[str, float] = {}
+    _last_activity: Dict[str, float] = {}
+    _budget = BUDGET_BURST
+    # Fração do orçamento deste processo (dividido entre os workers de polling)
+    _share = 1.0
+    _budget_updated: Optional[float] = None
+    skipped_for_budget = 0
+
+    @staticmethod
+    def _is_quiet_hour(now: float) -> bool:
+        start, end = PollSchedulerService.QUIET_HOURS
+        hour = time.localtime(now).tm_hour
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end
+
+    @staticmethod
+    def interval_for(discord_id: str, now: Optional[float] = None) -> float:
+        '''
+        Calcula o intervalo até a próxima consulta de um usuário.
+
+        Args:
+            discord_id (str): ID do usuário no Discord.
+            now (float): Momento de referência (epoch).
+
+        Returns:
+            float: Intervalo em segundos.
+        '''
+        now = now if now is not None else time.time()
+        last_activity = PollSchedulerService._last_activity.get(str(discord_id))
+
+        interval = PollSchedulerService.DORMANT_INTERVAL
+        if last_activity:
+            age = now - last_activity
+            for max_age, tier_interval in PollSchedulerService.ACTIVITY_TIERS:
+                if age <= max_age:
+                    interval = tier_interval
+                    break
+
+        if PollSchedulerService._is_quiet_hour(now):
+            interval *= PollSchedulerService.QUIET_FACTOR
+
+        jitter = PollSchedulerService.JITTER
+        return interval * random.uniform(1 - jitter, 1 + jitter)
+
+    @staticmethod
+    def set_share(share: float):
+        '''
+        Limita este processo a uma fração do orçamento global (um worker entre N).
+
+        Args:
+            share (float): Fração do orçamento (0 < share <= 1).
+        '''
+        if share != PollSchedulerService._share:
+            PollSchedulerService._share = share
+            PollSchedulerService._budget = min(PollSchedulerService._budget, PollSchedulerService.BUDGET_BURST * share)
+            logger.info(f"Orçamento de polling deste processo: {PollSchedulerService.BUDGET_PER_HOUR * share:.0f} consultas/h")
+
+    @staticmethod
+    def _refill_budget(now: float):
+        last = PollSchedulerService._budget_updated
+        PollSchedulerService._budget_updated = now
+        if last is None:
+            return
+        share = PollSchedulerService._share
+        PollSchedulerService._budget = min(
+            PollSchedulerService.BUDGET_BURST * share,
+            PollSchedulerService._budget + (now - last) * PollSchedulerService.BUDGET_PER_HOUR * share / 3600
+        )
+
+    @staticmethod
+    def due_users(users: Dict[str, str], now: Optional[float] = None) -> List[Tuple[str, str]]:
+        '''
+        Seleciona os usuários que devem ser consultados agora.
+
+        Usuários novos entram vencidos (primeira consulta imediata), com a
+        atividade inicial lida do histórico local. Os mais atrasados têm
+        prioridade quando o orçamento não comporta todos.
+
+        Args:
+            users (dict): Dicionário mapeando Discord ID para Steam ID.
+            now (float): Momento de referência (epoch).
+
+        Returns:
+            list: Pares (discord_id, steam_id) a consultar, consumindo o orçamento.
+        '''
+        now = now if now is not None else time.time()
+        PollSchedulerService._refill_budget(now)
+
+        next_poll = PollSchedulerService._next_poll
+        for discord_id in list(next_poll):
+            if discord_id not in users:
+                # Cadastro removido
+                del next_poll[discord_id]
+                PollSchedulerService._last_activity.pop(discord_id, None)
+
+        due = []
+        for discord_id, steam_id in users.items():
+            if discord_id not in next_poll:
+                next_poll[discord_id] = now
+                last_match = MatchHistoryService.last_match_time(steam_id)
+                if last_match:
+                    PollSchedulerService._last_activity[discord_id] = last_match
+            if next_poll[discord_id] <= now:
+                due.append((next_poll[discord_id], discord_id, steam_id))
+
+        due.sort()
+        allowed = int(PollSchedulerService._budget)
+        if len(due) > allowed:
+            PollSchedulerService.skipped_for_budget += len(due) - allowed
+            due = due[:allowed]
+        PollSchedulerService._budget -= len(due)
+        return [(discord_id, steam_id) for _, discord_id, steam_id in due]
+
+    @staticmethod
+    def record_poll(discord_id: str, last_match_time: Optional[float] = None, now: Optional[float] = None):
+        '''
+        Registra uma consulta e agenda a próxima.
+
+        Args:
+            discord_id (str): ID do usuário no Discord.
+            last_match_time (float): Término (epoch) da partida mais recente, se conhecido.
+            now (float): Momento de referência (epoch).
+        '''
+        now = now if now is not None else time.time()
+        discord_id = str(discord_id)
+        if last_match_time:
+            previous = PollSchedulerService._last_activity.get(discord_id, 0)
+            PollSchedulerService._last_activity[discord_id] = max(previous, last_match_time)
+        PollSchedulerService._next_poll[discord_id] = now + PollSchedulerService.interval_for(discord_id, now)
+
+    @staticmethod
+    def stats() -> dict:
+        '''
+        Retorna o estado da agenda e do orçamento.
+        '''
+        now = time.time()
+        return {
+            'scheduled_users': len(PollSchedulerService._next_poll),
+            'due_users': sum(1 for t in PollSchedulerService._next_poll.values() if t <= now),
+            'budget': round(PollSchedulerService._budget, 1),
+            'skipped_for_budget': PollSchedulerService.skipped_for_budget
+        }
@@ -0,0 +1,253 @@
+import asyncio
+import os
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+from services.leetify_service import LeetifyService
+from services.match_history_service import MatchHistoryService
+from services.match_tracker_service import MatchTrackerService
+from services.outbox_service import OutboxService
+from services.poll_scheduler_service import PollSchedulerService
+from services.prefetch_service import PrefetchService
+from services.rate_limit_service import Priority
+from services.rolling_stats_service import RollingStatsService
+from services.stats_service import StatsService
+from services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+class PollerService:
+    '''
+    Ciclo de verificação de partidas novas.
+
+    Roda dentro do bot (CS2Commands.check_new_matches) ou em processos
+    separados (worker.py), cada um com a sua parte dos usuários (ShardService).
+    As detecções viram jobs no OutboxService; a entrega no Discord fica com o bot.
+    '''
+
+    # Máximo de usuários consultados ao mesmo tempo no ciclo de verificação
+    POLL_CONCURRENCY = int(os.getenv("POLL_CONCURRENCY", "8"))
+    # Intervalo (segundos) entre verificações da agenda do PollSchedulerService
+    POLL_TICK = float(os.getenv("POLL_TICK", "60"))
+    # Máximo de partidas perdidas notificadas por usuário em um ciclo
+    BACKFILL_MAX = int(os.getenv("POLL_BACKFILL_MAX", "10"))
+    # Ciclos seguidos sem detalhes até a partida ser dada como vista sem notificação
+    # (ex.: 404 permanente em /v2/matches/{id})
+    DETAILS_MAX_FAILURES = int(os.getenv("POLL_DETAILS_MAX_FAILURES", "5"))
+    # Aquecimento do cache só faz sentido no processo que atende os comandos
+    PREFETCH = True
+
+    # Match ID -> ciclos seguidos em que os detalhes não vieram
+    _details_failures: Dict[str, int] = {}
+
+    @staticmethod
+    async def run_cycle(channel_id: int, users: Dict[str, str]) -> int:
+        '''
+        Executa um ciclo de verificação para os usuários informados.
+
+        Apenas os usuários vencidos na agenda adaptativa (PollSchedulerService)
+        são consultados, em paralelo, limitado por POLL_CONCURRENCY; o limitador
+        de taxa do LeetifyService continua valendo para todos.
+
+        Args:
+            channel_id (int): Canal de notificações.
+            users (dict): Usuários sob responsabilidade deste processo (Discord ID -> Steam ID).
+
+        Returns:
+            int: Quantidade de partidas novas detectadas.
+        '''
+        # Últimas partidas detectadas no ciclo, gravadas em lote ao final
+        latest_ids = {}
+        started = time.monotonic()
+        due = PollSchedulerService.due_users(users)
+        if not due:
+            return 0
+        semaphore = asyncio.Semaphore(PollerService.POLL_CONCURRENCY)
+        # Match ID -> Discord IDs que detectaram a partida neste ciclo
+        new_matches = {}
+
+        async def poll(discord_id, steam_id):
+            async with semaphore:
+                try:
+                    latest_match_id, new_match_ids = await PollerService._poll_user(discord_id, steam_id)
+                    if latest_match_id:
+                        latest_ids[discord_id] = latest_match_id
+                    for match_id in new_match_ids:
+                        new_matches.setdefault(match_id, []).append(discord_id)
+                except Exception as e:
+                    # Um usuário com erro não interrompe o ciclo dos demais
+                    logger.error(f"Erro ao verificar partidas de {discord_id}: {e}")
+                    PollSchedulerService.record_poll(discord_id)
+
+        async def fetch_details(match_id):
+            async with semaphore:
+                try:
+                    return await LeetifyService.get_match_details(match_id, Priority.BACKGROUND)
+                except Exception as e:
+                    logger.error(f"Erro ao buscar detalhes da partida {match_id}: {e}")
+                    return {}
+
+        await asyncio.gather(*(poll(d, s) for d, s in due))
+
+        # Uma busca de detalhes por partida, mesmo com vários cadastrados nela
+        match_ids = list(new_matches)
+        details = await asyncio.gather(*(fetch_details(m) for m in match_ids))
+
+        # Notificações em ordem cronológica, uma por partida
+        batch = sorted(
+            zip(match_ids, details),
+            key=lambda item: MatchHistoryService.match_timestamp(
+                item[1] or MatchHistoryService.get_match(item[0]) or {}
+            )
+        )
+        failed = set()
+        for match_id, match_details in batch:
+            try:
+                if not PollerService._process_new_match(channel_id, match_id, new_matches[match_id], match_details, users):
+                    failed.add(match_id)
+            except Exception as e:
+                logger.error(f"Erro ao processar partida {match_id}: {e}")
+                failed.add(match_id)
+
+        # A última partida só avança para quem teve todas as partidas novas
+        # enfileiradas; as demais continuam não vistas e voltam no próximo ciclo
+        pending = {discord_id for match_id in failed for discord_id in new_matches[match_id]}
+        MatchTrackerService.update_many({d: m for d, m in latest_ids.items() if d not in pending})
+        MatchTrackerService.flush()
+        if failed:
+            logger.warning(f"{len(failed)} partidas não enfileiradas ficam para o próximo ciclo")
+
+        # Agregados prontos para os comandos de quem jogou as partidas novas
+        RollingStatsService.update(PollerService._participants(batch, new_matches, users))
+
+        logger.info(
+            f"Ciclo de verificação concluído em {time.monotonic() - started:.1f}s: "
+            f"{len(due)}/{len(users)} usuários, {len(new_matches)} novas partidas"
+        )
+        return len(new_matches)
+
+    @staticmethod
+    def _participants(batch: list, new_matches: Dict[str, list], users: Dict[str, str]) -> set:
+        '''
+        Steam IDs cadastrados que participaram das partidas do ciclo.
+        '''
+        steam_ids = {users[d] for detected_by in new_matches.values() for d in detected_by if d in users}
+        for _, match_details in batch:
+            for steam_id in StatsService.match_players(match_details or {}):
+                if UserService.get_discord_id(steam_id):
+                    steam_ids.add(steam_id)
+        return steam_ids
+
+    @staticmethod
+    async def _poll_user(discord_id: str, steam_id: str) -> Tuple[Optional[str], List[str]]:
+        '''
+        Verifica as partidas novas de um usuário desde a última conhecida.
+
+        A lista da API é percorrida até a última partida conhecida (no máximo
+        BACKFILL_MAX partidas); partidas já processadas são ignoradas. Usuários
+        sem partida conhecida só têm a mais recente considerada.
+
+        Returns:
+            Tuple: (ID da partida mais recente se mudou, IDs novos em ordem cronológica).
+        '''
+        # Buscar partidas recentes. Um 304 não basta para pular a comparação: partidas
+        # pendentes de um ciclo anterior aparecem na mesma lista
+        matches, _ = await LeetifyService.poll_recent_matches(steam_id, Priority.BACKGROUND)
+        PollSchedulerService.record_poll(
+            discord_id, MatchHistoryService.match_timestamp(matches[0]) if matches else None
+        )
+        if not matches:
+            return None, []
+
+        latest_match_id = matches[0].get('id')
+        last_known_id = MatchTrackerService.get_last_match_id(discord_id)
+        if last_known_id == latest_match_id:
+            # Inclui o 304 (lista inalterada): só é comparada de novo enquanto
+            # houver partida pendente de um ciclo anterior
+            return None, []
+
+        if last_known_id is None:
+            candidates = matches[:1]
+        else:
+            candidates = []
+            for match in matches:
+                if match.get('id') == last_known_id:
+                    break
+                candidates.append(match)
+            candidates = candidates[:PollerService.BACKFILL_MAX]
+
+        new = [
+            m for m in candidates
+            if m.get('id') and not MatchTrackerService.is_seen(discord_id, m['id'])
+        ]
+        new.sort(key=MatchHistoryService.match_timestamp)
+        return latest_match_id, [m['id'] for m in new]
+
+    @staticmethod
+    def _process_new_match(channel_id: int, match_id: str, detected_by: list, match_details: dict,
+                           owned: Dict[str, str]) -> bool:
+        '''
+        Enfileira uma única notificação para todos os cadastrados que participaram da partida.
+
+        Só depois de o job estar gravado na outbox a partida é marcada como
+        vista para cada participante deste processo, inclusive os que ainda não
+        foram consultados neste ciclo. Participantes de outro worker são
+        marcados pelo próprio dono; a chave de idempotência da outbox impede a
+        notificação duplicada.
+
+        Partidas cujos detalhes não vêm em DETAILS_MAX_FAILURES ciclos seguidos
+        são marcadas como vistas sem notificação, para a última partida avançar.
+
+        Returns:
+            bool: False se a partida não pôde ser enfileirada (fica para o próximo ciclo).
+        '''
+        if not match_details:
+            failures = PollerService._details_failures.get(match_id, 0) + 1
+            if failures >= PollerService.DETAILS_MAX_FAILURES:
+                PollerService._details_failures.pop(match_id, None)
+                logger.warning(f"Detalhes da partida {match_id} indisponíveis após {failures} ciclos; marcada como vista sem notificação")
+                for discord_id in detected_by:
+                    MatchTrackerService.mark_seen(discord_id, match_id)
+                return True
+
+            PollerService._details_failures[match_id] = failures
+            if failures == 1:
+                # A lista em cache pode estar desatualizada; nas próximas tentativas o cache fica intacto
+                for discord_id in detected_by:
+                    LeetifyService.invalidate_player(UserService.get_steam_id(discord_id))
+            return False
+
+        PollerService._details_failures.pop(match_id, None)
+
+        participants = []
+        for steam_id in StatsService.match_players(match_details):
+            discord_id = UserService.get_discord_id(steam_id)
+            if not discord_id:
+                continue
+            if discord_id not in detected_by and discord_id in owned:
+                if MatchTrackerService.is_seen(discord_id, match_id):
+                    continue
+            # Perfil e lista em cache ficaram desatualizados
+            LeetifyService.invalidate_player(steam_id)
+            participants.append((discord_id, steam_id))
+
+        if participants:
+            OutboxService.enqueue(
+                f"match:{match_id}:{channel_id}", channel_id,
+                {'match_id': match_id, 'participants': [discord_id for discord_id, _ in participants]}
+            )
+
+        for discord_id in detected_by:
+            MatchTrackerService.mark_seen(discord_id, match_id)
+        for discord_id, _ in participants:
+            if discord_id in owned:
+                MatchTrackerService.mark_seen(discord_id, match_id)
+
+        if not participants:
+            return True
+
+        if PollerService.PREFETCH:
+            # Aquecer o cache para os comandos usados logo após a notificação; os demais
+            # participantes são aquecidos pelo PrefetchService, dentro de BUDGET_PER_MATCH
+            PrefetchService.schedule_activity(participants[0][1], match_id)
+        return True
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import logging
+from typing import Optional
+from services.cache_service import TTLCache
+from services.leetify_service import LeetifyService
+from services.rate_limit_service import Priority
+from services.stats_service import StatsService
+from services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+class PrefetchService:
+    '''
+    Aquecimento do cache após atividade detectada pelo poller.
+
+    Quando um jogador termina uma partida, os comandos que o pessoal usa logo
+    depois da notificação (!perfil, !partida, !recentes) encontram o cache
+    quente. Tudo roda na fila BACKGROUND do limitador de taxa.
+    '''
+
+    # Máximo de outros jogadores cadastrados aquecidos por partida detectada
+    BUDGET_PER_MATCH = int(os.getenv("PREFETCH_BUDGET_PER_MATCH", "4"))
+    # Máximo de jogadores aguardando na fila
+    QUEUE_MAX_SIZE = int(os.getenv("PREFETCH_QUEUE_MAX_SIZE", "200"))
+    # Jogadores aquecidos recentemente não são aquecidos de novo neste intervalo
+    COOLDOWN = float(os.getenv("PREFETCH_COOLDOWN", "300"))
+
+    _queue: Optional[asyncio.Queue] = None
+    _worker: Optional[asyncio.Task] = None
+    _recent = TTLCache(maxsize=4096, default_ttl=COOLDOWN)
+    warmed_players = 0
+    dropped_jobs = 0
+
+    @staticmethod
+    def start():
+        '''
+        Inicia o worker de aquecimento (idempotente). Deve rodar dentro do event loop.
+        '''
+        if PrefetchService._worker is not None and not PrefetchService._worker.done():
+            return
+        PrefetchService._queue = asyncio.Queue(maxsize=PrefetchService.QUEUE_MAX_SIZE)
+        PrefetchService._worker = asyncio.ensure_future(PrefetchService._run())
+
+    @staticmethod
+    def stop():
+        '''
+        Cancela o worker e descarta a fila pendente.
+        '''
+        if PrefetchService._worker is not None:
+            PrefetchService._worker.cancel()
+        PrefetchService._worker = None
+        PrefetchService._queue = None
+
+    @staticmethod
+    def schedule_activity(steam_id: str, match_id: str = None):
+        '''
+        Agenda o aquecimento de um jogador com atividade nova.
+
+        Args:
+            steam_id (str): Steam ID do jogador que terminou a partida.
+            match_id (str): Partida detectada; seus detalhes também são aquecidos,
+                assim como os outros participantes cadastrados.
+        '''
+        PrefetchService.start()
+        # O cache do jogador acabou de ser invalidado: ignora o cooldown
+        PrefetchService._enqueue((steam_id, match_id), force=True)
+
+    @staticmethod
+    def _enqueue(job: tuple, force: bool = False) -> bool:
+        steam_id = job[0]
+        if not force and steam_id in PrefetchService._recent:
+            return False
+        try:
+            PrefetchService._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            PrefetchService.dropped_jobs += 1
+            return False
+        PrefetchService._recent.set(steam_id, True)
+        return True
+
+    @staticmethod
+    async def _run():
+        while True:
+            job = await PrefetchService._queue.get()
+            try:
+                await PrefetchService._warm(*job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao aquecer cache de {job[0]}: {e}")
+            finally:
+                PrefetchService._queue.task_done()
+
+    @staticmethod
+    async def _warm(steam_id: str, match_id: Optional[str]):
+        await LeetifyService.get_user_profile(steam_id, Priority.BACKGROUND)
+        await LeetifyService.get_recent_matches(steam_id, Priority.BACKGROUND)
+        PrefetchService.warmed_players += 1
+
+        if not match_id:
+            return
+
+        match = await LeetifyService.get_match_details(match_id, Priority.BACKGROUND)
+        others = [
+            other for other in StatsService.match_players(match)
+            if other != steam_id and UserService.is_registered_steam_id(other)
+        ]
+        for other in others[:PrefetchService.BUDGET_PER_MATCH]:
+            # A partida já está em disco; basta aquecer perfil e lista
+            PrefetchService._enqueue((other, None))
+
+    @staticmethod
+    def stats() -> dict:
+        '''
+        Retorna os contadores do aquecimento.
+        '''
+        return {
+            'pending': PrefetchService._queue.qsize() if PrefetchService._queue else 0,
+            'warmed_players': PrefetchService.warmed_players,
+            'dropped_jobs': PrefetchService.dropped_jobs
+        }
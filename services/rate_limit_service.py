@@ -0,0 +1,132 @@
+import asyncio
+import random
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class Priority(IntEnum):
+    '''
+    Filas de prioridade do limitador. Valores menores são atendidos primeiro.
+    '''
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+class TokenBucketLimiter:
+    '''
+    Limitador de taxa (token bucket) compartilhado por todas as chamadas à API.
+
+    Requisições de prioridade BACKGROUND (poller, resumos) só consomem tokens
+    quando não há comandos interativos aguardando.
+    '''
+
+    def __init__(self, rate: float, capacity: int):
+        '''
+        Args:
+            rate (float): Tokens repostos por segundo (requisições/s sustentadas).
+            capacity (int): Tamanho máximo do balde (rajada permitida).
+        '''
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = {p: 0 for p in Priority}
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def _has_priority_waiters(self, priority: Priority) -> bool:
+        return any(count for p, count in self._waiting.items() if p < priority)
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE):
+        '''
+        Aguarda até haver um token disponível para a prioridade informada.
+
+        Args:
+            priority (Priority): Fila da requisição.
+        '''
+        self._waiting[priority] += 1
+        try:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._has_priority_waiters(priority):
+                    delay = 1 / self.rate
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    delay = (1 - self._tokens) / self.rate
+
+                await asyncio.sleep(delay)
+        finally:
+            self._waiting[priority] -= 1
+
+    def pause(self, seconds: float):
+        '''
+        Suspende todas as filas por um período (ex.: após um 429 com Retry-After).
+
+        Args:
+            seconds (float): Duração da pausa.
+        '''
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.warning(f"Limitador do Leetify pausado por {seconds:.1f}s")
+
+    def set_rate(self, rate: float, capacity: int):
+        '''
+        Altera a taxa e o tamanho do balde (ex.: limite dividido entre processos).
+        '''
+        self._refill(time.monotonic())
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = min(self._tokens, capacity)
+
+    def stats(self) -> dict:
+        '''
+        Retorna o estado atual do limitador.
+        '''
+        self._refill(time.monotonic())
+        return {
+            'tokens': round(self._tokens, 2),
+            'rate': self.rate,
+            'capacity': self.capacity,
+            'waiting': {p.name.lower(): c for p, c in self._waiting.items()}
+        }
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    '''
+    Interpreta o header Retry-After (segundos ou data HTTP).
+
+    Returns:
+        float: Segundos a aguardar ou None se ausente/inválido.
+    '''
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    '''
+    Calcula o atraso exponencial com jitter completo para uma nova tentativa.
+
+    Args:
+        attempt (int): Número da tentativa (começando em 0).
+        base (float): Atraso base em segundos.
+        cap (float): Atraso máximo em segundos.
+    '''
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
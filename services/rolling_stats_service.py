@@ -0,0 +1,202 @@
+import bisect
+import time
+import logging
+from collections import deque
+from typing import Dict, Iterable, Optional
+from services.columnar_stats_service import StatsTable
+from services.match_history_service import MatchHistoryService
+
+logger = logging.getLogger(__name__)
+
+class RollingWindow:
+    '''
+    Janela deslizante de partidas com somas acumuladas.
+
+    As partidas entram em ordem cronológica; adicionar e descartar uma partida
+    custa O(1), e o resumo é lido direto das somas.
+    '''
+
+    __slots__ = ('max_count', 'span', 'rows', 'count', 'kills', 'deaths', 'kd', 'hs_pct', 'rating', 'wins')
+
+    def __init__(self, max_count: Optional[int] = None, span: Optional[float] = None):
+        '''
+        Args:
+            max_count (int): Mantém apenas as últimas N partidas.
+            span (float): Mantém apenas as partidas terminadas nos últimos span segundos.
+        '''
+        self.max_count = max_count
+        self.span = span
+        self.rows = deque()
+        self.count = self.kills = self.deaths = self.wins = 0
+        self.kd = self.hs_pct = self.rating = 0.0
+
+    def _apply(self, row: tuple, sign: int):
+        kills, deaths, kd, hs_pct, rating, win, _ = row
+        self.count += sign
+        self.kills += sign * kills
+        self.deaths += sign * deaths
+        self.kd += sign * kd
+        self.hs_pct += sign * hs_pct
+        self.rating += sign * rating
+        self.wins += sign * win
+
+    def add(self, row: tuple, now: float):
+        self.rows.append(row)
+        self._apply(row, 1)
+        self.evict(now)
+
+    def evict(self, now: float):
+        '''
+        Descarta as partidas que saíram da janela.
+        '''
+        rows = self.rows
+        while rows and (
+            (self.max_count is not None and len(rows) > self.max_count)
+            or (self.span is not None and rows[0][-1] < now - self.span)
+        ):
+            self._apply(rows.popleft(), -1)
+        if not rows:
+            # Zera o erro de ponto flutuante acumulado nas subtrações
+            self.kd = self.hs_pct = self.rating = 0.0
+
+    def snapshot(self) -> Optional[Dict]:
+        '''
+        Retorna o resumo no mesmo formato de StatsService.calculate_average_stats.
+        '''
+        if self.count == 0:
+            return None
+        count = self.count
+        wins = int(self.wins)
+        return {
+            'matches_count': count,
+            'avg_kd': self.kd / count,
+            'avg_hs_pct': self.hs_pct / count,
+            'avg_rating': self.rating / count,
+            'win_rate': (wins / count) * 100,
+            'wins': wins,
+            'losses': count - wins,
+            'total_kills': self.kills,
+            'total_deaths': self.deaths
+        }
+
+class RollingStatsService:
+    '''
+    Agregados por jogador mantidos de forma incremental sobre janelas fixas.
+
+    A fonte é o MatchHistoryService: cada leitura incorpora apenas as partidas
+    que chegaram ao histórico desde a anterior, e o poller chama update() para
+    os jogadores com partida nova, deixando os números prontos para os
+    comandos. Partidas inseridas fora de ordem (backfill) reconstroem as
+    janelas do jogador a partir do histórico.
+    '''
+
+    # nome -> (últimas N partidas, intervalo em segundos)
+    WINDOWS = {
+        'last5': (5, None),
+        'last10': (10, None),
+        '7d': (None, 7 * 24 * 3600),
+    }
+
+    # steam_id -> {'windows': {nome: RollingWindow}, 'synced': int, 'last_entry': tuple}
+    _players: Dict[str, dict] = {}
+
+    # Janela dos comandos (MatchHistoryService.parse_window) -> janela pré-calculada
+    COMMAND_WINDOWS = {'': 'last10', '10': 'last10', '5': 'last5', 'semana': '7d'}
+
+    @staticmethod
+    def window_name(janela: Optional[str]) -> Optional[str]:
+        '''
+        Retorna a janela pré-calculada equivalente à janela de um comando, se houver.
+        '''
+        return RollingStatsService.COMMAND_WINDOWS.get((janela or '').strip().lower())
+
+    @staticmethod
+    def _row(match: dict, steam_id: str) -> Optional[tuple]:
+        rows = StatsTable.build_rows([match], steam_id)
+        if not rows:
+            return None
+        kills, deaths, hs_kills, _, kd, rating, win, finished_at, _ = rows[0]
+        hs_pct = (hs_kills / kills) * 100 if kills > 0 else 0.0
+        return (kills, deaths, kd, hs_pct, rating, win, finished_at)
+
+    @staticmethod
+    def _rebuild(steam_id: str, now: float) -> dict:
+        '''
+        Monta as janelas do jogador a partir do histórico.
+        '''
+        windows = {
+            name: RollingWindow(max_count, span)
+            for name, (max_count, span) in RollingStatsService.WINDOWS.items()
+        }
+        entries = MatchHistoryService.get_player_entries(steam_id)
+
+        # Só a cauda do histórico pode cair em alguma janela
+        max_count = max((c for c, _ in RollingStatsService.WINDOWS.values() if c), default=0)
+        max_span = max((s for _, s in RollingStatsService.WINDOWS.values() if s), default=0)
+        start = min(max(len(entries) - max_count, 0), bisect.bisect_left(entries, (now - max_span, '')))
+
+        state = {'windows': windows, 'synced': start, 'last_entry': entries[start - 1] if start else None}
+        RollingStatsService._players[steam_id] = state
+        RollingStatsService._ingest(steam_id, state, entries[start:], now)
+        return state
+
+    @staticmethod
+    def _ingest(steam_id: str, state: dict, entries: list, now: float):
+        for entry in entries:
+            match = MatchHistoryService.get_match(entry[1])
+            row = RollingStatsService._row(match, steam_id) if match else None
+            if row is not None:
+                for window in state['windows'].values():
+                    window.add(row, now)
+            state['synced'] += 1
+            state['last_entry'] = entry
+
+    @staticmethod
+    def _sync(steam_id: str, now: float) -> dict:
+        '''
+        Incorpora as partidas que chegaram ao histórico desde a última leitura.
+        '''
+        state = RollingStatsService._players.get(steam_id)
+        if state is None:
+            return RollingStatsService._rebuild(steam_id, now)
+
+        synced = state['synced']
+        if MatchHistoryService.player_match_count(steam_id) == synced:
+            return state
+
+        tail = MatchHistoryService.get_player_entries(steam_id, max(synced - 1, 0))
+        if not synced or not tail or tail[0] != state['last_entry']:
+            # Partida inserida antes da última já contabilizada
+            return RollingStatsService._rebuild(steam_id, now)
+
+        RollingStatsService._ingest(steam_id, state, tail[1:], now)
+        return state
+
+    @staticmethod
+    def update(steam_ids: Iterable[str]):
+        '''
+        Atualiza as janelas dos jogadores com partidas novas (chamado pelo poller).
+        '''
+        now = time.time()
+        for steam_id in steam_ids:
+            try:
+                RollingStatsService._sync(steam_id, now)
+            except Exception as e:
+                logger.error(f"Erro ao atualizar agregados de {steam_id}: {e}")
+
+    @staticmethod
+    def get_stats(steam_id: str, window: str = 'last10') -> Optional[Dict]:
+        '''
+        Retorna o resumo pré-calculado de um jogador em uma janela.
+
+        Args:
+            steam_id (str): Steam ID 64 do jogador.
+            window (str): Nome da janela (ver WINDOWS).
+
+        Returns:
+            Dict: Mesmo formato de StatsService.calculate_average_stats ou None.
+        '''
+        now = time.time()
+        rolling = RollingStatsService._sync(steam_id, now)['windows'][window]
+        rolling.evict(now)
+        return rolling.snapshot()
@@ -0,0 +1,152 @@
+import bisect
+import hashlib
+import os
+import socket
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+from services.json_service import JsonService
+from services.storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+class ShardService:
+    '''
+    Divisão dos usuários entre processos de polling (worker.py).
+
+    Cada worker grava um heartbeat na tabela 'workers' do armazenamento
+    compartilhado (STORAGE_BACKEND=sqlite). Os workers ativos formam um anel
+    de hash consistente e cada Discord ID pertence ao primeiro worker após o
+    seu hash no anel. Quando um worker entra ou sai, só a fatia vizinha dele
+    muda de dono.
+
+    Com POLLER_MODE=workers o bot deixa de fazer polling e apenas entrega a
+    outbox preenchida pelos workers.
+
+    Bot e workers precisam rodar na mesma máquina: o SQLite em WAL não
+    funciona em sistemas de arquivos de rede, e o histórico de partidas
+    (data/history/matches.jsonl) também é um arquivo local. Cada heartbeat
+    registra o host, e um worker não entra no anel se houver outro ativo em
+    um host diferente.
+    '''
+
+    TABLE = 'workers'
+    ENABLED = os.getenv("POLLER_MODE", "local").lower() == 'workers'
+
+    HEARTBEAT_INTERVAL = float(os.getenv("WORKER_HEARTBEAT_INTERVAL", "15"))
+    # Worker sem heartbeat há mais que isso sai do anel
+    HEARTBEAT_TIMEOUT = float(os.getenv("WORKER_HEARTBEAT_TIMEOUT", "60"))
+    # Pontos de cada worker no anel (distribuição mais uniforme)
+    VIRTUAL_NODES = 64
+
+    HOST = socket.gethostname()
+
+    _members: Tuple[str, ...] = ()
+    _ring: List[Tuple[int, str]] = []
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.sha1(value.encode('utf-8')).digest()[:8], 'big')
+
+    @staticmethod
+    def heartbeat(worker_id: str):
+        '''
+        Registra que o worker está vivo.
+        '''
+        value = JsonService.dumps({'heartbeat': time.time(), 'host': ShardService.HOST}).decode('utf-8')
+        StorageService.get_backend().upsert_many(ShardService.TABLE, {worker_id: value})
+
+    @staticmethod
+    def leave(worker_id: str):
+        '''
+        Remove o worker do anel (encerramento normal).
+        '''
+        StorageService.get_backend().delete(ShardService.TABLE, worker_id)
+
+    @staticmethod
+    def _active(now: Optional[float] = None) -> Dict[str, str]:
+        '''
+        Workers com heartbeat recente (worker_id -> host).
+        '''
+        now = now if now is not None else time.time()
+        active = {}
+        for worker_id, value in StorageService.get_backend().load(ShardService.TABLE).items():
+            try:
+                entry = JsonService.loads(value)
+            except (ValueError, TypeError):
+                continue
+            if isinstance(entry, dict) and now - float(entry.get('heartbeat', 0)) <= ShardService.HEARTBEAT_TIMEOUT:
+                active[worker_id] = entry.get('host')
+        return active
+
+    @staticmethod
+    def active_workers(now: Optional[float] = None) -> List[str]:
+        '''
+        Lista os workers com heartbeat recente.
+        '''
+        return sorted(ShardService._active(now))
+
+    @staticmethod
+    def worker_count(worker_id: Optional[str] = None) -> int:
+        '''
+        Quantidade de workers ativos, contando worker_id mesmo antes do primeiro heartbeat.
+        '''
+        workers = set(ShardService.active_workers())
+        if worker_id:
+            workers.add(worker_id)
+        return len(workers)
+
+    @staticmethod
+    def foreign_hosts(worker_id: str) -> List[str]:
+        '''
+        Hosts de outros workers ativos diferentes do host deste processo.
+        '''
+        return sorted({
+            host for other, host in ShardService._active().items()
+            if other != worker_id and host != ShardService.HOST
+        })
+
+    @staticmethod
+    def _build_ring(members: Tuple[str, ...]):
+        if members == ShardService._members:
+            return
+        ring = []
+        for worker_id in members:
+            for replica in range(ShardService.VIRTUAL_NODES):
+                ring.append((ShardService._hash(f"{worker_id}#{replica}"), worker_id))
+        ring.sort()
+        logger.info(f"Workers ativos: {list(members) or 'nenhum'}")
+        ShardService._members = members
+        ShardService._ring = ring
+
+    @staticmethod
+    def owner(discord_id: str) -> Optional[str]:
+        '''
+        Retorna o worker responsável por um usuário no anel atual.
+        '''
+        ring = ShardService._ring
+        if not ring:
+            return None
+        index = bisect.bisect(ring, (ShardService._hash(str(discord_id)), ''))
+        return ring[index % len(ring)][1]
+
+    @staticmethod
+    def owned_users(worker_id: str, users: Dict[str, str]) -> Dict[str, str]:
+        '''
+        Filtra os usuários que pertencem ao worker, atualizando o anel.
+
+        Args:
+            worker_id (str): ID deste worker.
+            users (dict): Todos os cadastros (Discord ID -> Steam ID).
+
+        Returns:
+            dict: Cadastros sob responsabilidade deste worker.
+        '''
+        members = set(ShardService.active_workers())
+        # O próprio worker está vivo mesmo que o heartbeat ainda não tenha sido lido
+        members.add(worker_id)
+        ShardService._build_ring(tuple(sorted(members)))
+        return {
+            discord_id: steam_id for discord_id, steam_id in users.items()
+            if ShardService.owner(discord_id) == worker_id
+        }
@@ -1,5 +1,6 @@
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
+from services.json_service import JsonService
 
 logger = logging.getLogger(__name__)
 
@@ -70,7 +71,23 @@ class StatsService:
         '''
         Extrai as estatísticas de um jogador específico de uma partida.
         '''
-        return next((s for s in match.get('stats', []) if s['steam64_id'] == steam_id), None)
+        return JsonService.as_match(match).player(steam_id)
+
+    @staticmethod
+    def match_players(match: Dict) -> Dict[str, Dict]:
+        '''
+        Retorna o índice steam64_id -> estatísticas dos jogadores da partida.
+
+        O índice é montado uma única vez na ingestão (JsonService.project_match).
+        '''
+        return JsonService.as_match(match).players
+
+    @staticmethod
+    def team_roster(match: Dict, team_number) -> Sequence[Dict]:
+        '''
+        Retorna as estatísticas dos jogadores de um time da partida.
+        '''
+        return JsonService.as_match(match).teams.get(team_number, ())
 
     @staticmethod
     def analyze_cheaters(matches: List[Dict]) -> Dict:
@@ -110,9 +127,9 @@ class StatsService:
                 total_matches_analyzed += 1
                 user_team = user_stats.get('initial_team_number')
 
-                for stat in match.get('stats', []):
+                for stat in StatsService.team_roster(match, user_team):
                     teammate_id = stat['steam64_id']
-                    if teammate_id != user_steam_id and stat.get('initial_team_number') == user_team:
+                    if teammate_id != user_steam_id:
                         if teammate_id not in teammates:
                             teammates[teammate_id] = {
                                 'steam_id': teammate_id,
@@ -0,0 +1,330 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class JsonStorageBackend:
+    '''
+    Backend padrão: um arquivo JSON por tabela, reescrito a cada alteração.
+    '''
+
+    FILES = {
+        'users': 'data/users.json',
+        'last_matches': 'data/last_matches.json',
+        'seen_matches': 'data/seen_matches.json',
+        'outbox': 'data/outbox.json',
+        'workers': 'data/workers.json',
+        'config': 'data/config.json',
+    }
+
+    def __init__(self, files: Dict[str, str] = None):
+        self.files = dict(files or JsonStorageBackend.FILES)
+
+    def load(self, table: str) -> dict:
+        '''
+        Carrega todas as linhas de uma tabela.
+
+        Returns:
+            dict: Dicionário chave -> valor.
+        '''
+        path = self.files[table]
+        if not os.path.exists(path):
+            return {}
+
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Erro ao carregar {path}: {e}")
+            return {}
+
+    def get(self, table: str, key: str) -> Optional[str]:
+        return self.load(table).get(str(key))
+
+    def upsert_many(self, table: str, items: dict):
+        '''
+        Insere ou atualiza várias linhas de uma vez.
+
+        Args:
+            table (str): Nome da tabela.
+            items (dict): Dicionário chave -> valor.
+        '''
+        if not items:
+            return
+        data = self.load(table)
+        data.update({str(k): v for k, v in items.items()})
+        self._save(table, data)
+
+    def insert_if_absent(self, table: str, key: str, value) -> bool:
+        '''
+        Insere uma linha apenas se a chave ainda não existir.
+
+        Returns:
+            bool: False se a chave já existia.
+        '''
+        data = self.load(table)
+        if str(key) in data:
+            return False
+        data[str(key)] = value
+        self._save(table, data)
+        return True
+
+    def delete(self, table: str, key: str):
+        data = self.load(table)
+        if data.pop(str(key), None) is not None:
+            self._save(table, data)
+
+    def _save(self, table: str, data: dict):
+        '''
+        Grava o arquivo de forma atômica: escreve em um temporário e renomeia,
+        para que uma queda no meio da escrita nunca deixe o JSON corrompido.
+
+        Erros de escrita são propagados, como no backend SQLite, para que o
+        chamador possa manter as alterações pendentes e tentar de novo.
+        '''
+        path = self.files[table]
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Erro ao salvar {path}: {e}")
+            raise
+
+class SQLiteStorageBackend:
+    '''
+    Backend SQLite em modo WAL, com uma tabela indexada por coleção.
+
+    Cada alteração grava apenas as linhas modificadas, em uma única transação.
+    '''
+
+    DB_FILE = 'data/bot.db'
+
+    # tabela -> (coluna chave, coluna valor)
+    TABLES = {
+        'users': ('discord_id', 'steam_id'),
+        'last_matches': ('discord_id', 'match_id'),
+        'seen_matches': ('discord_id', 'match_ids'),
+        'outbox': ('key', 'job'),
+        'workers': ('worker_id', 'heartbeat'),
+        'config': ('key', 'value'),
+    }
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS users (
+            discord_id TEXT PRIMARY KEY,
+            steam_id TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_users_steam_id ON users (steam_id);
+
+        CREATE TABLE IF NOT EXISTS last_matches (
+            discord_id TEXT PRIMARY KEY,
+            match_id TEXT NOT NULL,
+            updated_at INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))
+        );
+
+        CREATE TABLE IF NOT EXISTS seen_matches (
+            discord_id TEXT PRIMARY KEY,
+            match_ids TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS outbox (
+            key TEXT PRIMARY KEY,
+            job TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS workers (
+            worker_id TEXT PRIMARY KEY,
+            heartbeat TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS config (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    '''
+
+    def __init__(self, path: str = None):
+        self.path = path or SQLiteStorageBackend.DB_FILE
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Acesso também a partir de threads (asyncio.to_thread); serializado pelo lock
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA busy_timeout=5000')
+        self.conn.executescript(SQLiteStorageBackend.SCHEMA)
+
+    def _columns(self, table: str) -> tuple:
+        if table not in SQLiteStorageBackend.TABLES:
+            raise ValueError(f"Tabela desconhecida: {table}")
+        return SQLiteStorageBackend.TABLES[table]
+
+    def load(self, table: str) -> dict:
+        key_col, value_col = self._columns(table)
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {key_col}, {value_col} FROM {table}").fetchall()
+        return {k: v for k, v in rows}
+
+    def get(self, table: str, key: str) -> Optional[str]:
+        key_col, value_col = self._columns(table)
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {value_col} FROM {table} WHERE {key_col} = ?", (str(key),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def upsert_many(self, table: str, items: dict):
+        if not items:
+            return
+        key_col, value_col = self._columns(table)
+        sql = (
+            f"INSERT INTO {table} ({key_col}, {value_col}) VALUES (?, ?) "
+            f"ON CONFLICT ({key_col}) DO UPDATE SET {value_col} = excluded.{value_col}"
+        )
+        with self._lock, self.transaction():
+            self.conn.executemany(sql, [(str(k), v) for k, v in items.items()])
+
+    def insert_if_absent(self, table: str, key: str, value) -> bool:
+        '''
+        Insere uma linha apenas se a chave ainda não existir, de forma atômica
+        também entre processos.
+
+        Returns:
+            bool: False se a chave já existia.
+        '''
+        key_col, value_col = self._columns(table)
+        with self._lock:
+            cursor = self.conn.execute(
+                f"INSERT INTO {table} ({key_col}, {value_col}) VALUES (?, ?) ON CONFLICT ({key_col}) DO NOTHING",
+                (str(key), value)
+            )
+        return cursor.rowcount == 1
+
+    def delete(self, table: str, key: str):
+        key_col, _ = self._columns(table)
+        with self._lock:
+            self.conn.execute(f"DELETE FROM {table} WHERE {key_col} = ?", (str(key),))
+
+    def transaction(self):
+        '''
+        Context manager de transação (BEGIN/COMMIT, ROLLBACK em caso de erro).
+        '''
+        return _Transaction(self.conn)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value", (key, value)
+            )
+
+    def import_json(self, source: JsonStorageBackend, force: bool = False) -> Dict[str, int]:
+        '''
+        Importa os arquivos JSON existentes para o banco (uma única vez).
+
+        Args:
+            source (JsonStorageBackend): Backend JSON de origem.
+            force (bool): Importa novamente mesmo que já tenha sido feito.
+
+        Returns:
+            dict: Quantidade de linhas importadas por tabela.
+        '''
+        if not force and self.get_meta('json_imported'):
+            return {}
+
+        counts = {}
+        with self._lock, self.transaction():
+            for table in SQLiteStorageBackend.TABLES:
+                if table not in source.files:
+                    continue
+                data = source.load(table)
+                key_col, value_col = self._columns(table)
+                self.conn.executemany(
+                    f"INSERT INTO {table} ({key_col}, {value_col}) VALUES (?, ?) "
+                    f"ON CONFLICT ({key_col}) DO UPDATE SET {value_col} = excluded.{value_col}",
+                    [(str(k), v) for k, v in data.items()]
+                )
+                counts[table] = len(data)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', strftime('%s', 'now'))"
+            )
+        logger.info(f"Importação dos arquivos JSON para {self.path}: {counts}")
+        return counts
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute('COMMIT')
+        else:
+            self.conn.execute('ROLLBACK')
+        return False
+
+class StorageService:
+    '''
+    Seleciona o backend de armazenamento usado por UserService,
+    MatchTrackerService e ConfigService.
+
+    STORAGE_BACKEND=json (padrão) mantém os arquivos JSON; STORAGE_BACKEND=sqlite
+    usa o banco em SQLITE_PATH, importando os JSON existentes na primeira execução.
+    '''
+
+    BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+    SQLITE_PATH = os.getenv("SQLITE_PATH", SQLiteStorageBackend.DB_FILE)
+
+    _backend = None
+
+    @staticmethod
+    def get_backend():
+        '''
+        Retorna o backend configurado, criando-o na primeira chamada.
+        '''
+        if StorageService._backend is None:
+            if StorageService.BACKEND == 'sqlite':
+                backend = SQLiteStorageBackend(StorageService.SQLITE_PATH)
+                backend.import_json(JsonStorageBackend())
+            else:
+                backend = JsonStorageBackend()
+            StorageService._backend = backend
+        return StorageService._backend
+
+    @staticmethod
+    def set_backend(backend):
+        '''
+        Substitui o backend em uso (ex.: testes ou scripts de migração).
+        '''
+        StorageService._backend = backend
+
+if __name__ == '__main__':
+    # Importação manual: python -m services.storage_service [caminho.db]
+    logging.basicConfig(level=logging.INFO)
+    target = SQLiteStorageBackend(sys.argv[1] if len(sys.argv) > 1 else StorageService.SQLITE_PATH)
+    print(target.import_json(JsonStorageBackend(), force=True))
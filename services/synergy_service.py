@@ -0,0 +1,134 @@
+import os
+import threading
+import logging
+from typing import Dict, FrozenSet, List, Optional
+from services.match_history_service import MatchHistoryService
+from services.stats_service import StatsService
+from services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+class SynergyService:
+    '''
+    Sinergia entre pares de jogadores cadastrados (duplas).
+
+    Mantém uma matriz esparsa, montada a partir do histórico local, com o
+    número de partidas jogadas no mesmo time e as vitórias de cada dupla de
+    cadastrados. A matriz é atualizada de forma incremental: cada leitura
+    processa apenas as partidas que entraram no histórico desde a anterior.
+    Uma mudança nos cadastros reconstrói a matriz do zero.
+    '''
+
+    # Mínimo de partidas juntos para a dupla aparecer nos rankings
+    MIN_MATCHES = int(os.getenv("SYNERGY_MIN_MATCHES", "3"))
+
+    # steam_id -> {steam_id do parceiro: [partidas, vitórias]} (o mesmo contador nos dois sentidos)
+    _pairs: Dict[str, Dict[str, list]] = {}
+    # Posição do histórico já processada
+    _synced = 0
+    _registered: FrozenSet[str] = frozenset()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _add_match(match: dict, registered: FrozenSet[str]):
+        teams = {}
+        for steam_id, stat in StatsService.match_players(match).items():
+            if steam_id in registered:
+                teams.setdefault(stat.get('initial_team_number'), []).append(steam_id)
+
+        winner = match.get('winner_team_number')
+        for team, members in teams.items():
+            if len(members) < 2:
+                continue
+            members.sort()
+            won = 1 if winner == team else 0
+            for index, first in enumerate(members):
+                for second in members[index + 1:]:
+                    counter = SynergyService._pairs.setdefault(first, {}).get(second)
+                    if counter is None:
+                        counter = [0, 0]
+                        SynergyService._pairs[first][second] = counter
+                        SynergyService._pairs.setdefault(second, {})[first] = counter
+                    counter[0] += 1
+                    counter[1] += won
+
+    @staticmethod
+    def refresh() -> int:
+        '''
+        Incorpora as partidas novas do histórico à matriz.
+
+        Returns:
+            int: Quantidade de partidas processadas.
+        '''
+        registered = UserService.get_registered_steam_ids()
+        with SynergyService._lock:
+            rebuild = registered != SynergyService._registered
+            if rebuild:
+                # Novo cadastro: as partidas antigas também contam para ele
+                SynergyService._pairs = {}
+                SynergyService._synced = 0
+                SynergyService._registered = registered
+
+            matches = MatchHistoryService.get_matches_from(SynergyService._synced)
+            for match in matches:
+                SynergyService._add_match(match, registered)
+            SynergyService._synced += len(matches)
+
+        if rebuild:
+            logger.info(f"Matriz de sinergia montada: {len(matches)} partidas, {SynergyService.pair_count()} duplas")
+        return len(matches)
+
+    @staticmethod
+    def _entry(first: str, second: str, counter: list) -> Dict:
+        matches, wins = counter
+        return {
+            'steam_ids': (first, second),
+            'matches': matches,
+            'wins': wins,
+            'win_rate': (wins / matches) * 100
+        }
+
+    @staticmethod
+    def get_duos(steam_id: str, min_matches: Optional[int] = None) -> List[Dict]:
+        '''
+        Retorna as duplas de um jogador, da maior para a menor taxa de vitória.
+
+        Lê a matriz como está; chame refresh() antes (fora do event loop).
+
+        Args:
+            steam_id (str): Steam ID 64 do jogador.
+            min_matches (int): Mínimo de partidas juntos (padrão MIN_MATCHES).
+
+        Returns:
+            List[Dict]: {'steam_ids': (jogador, parceiro), 'matches', 'wins', 'win_rate'}.
+        '''
+        minimum = SynergyService.MIN_MATCHES if min_matches is None else min_matches
+        with SynergyService._lock:
+            duos = [
+                SynergyService._entry(steam_id, partner, counter)
+                for partner, counter in SynergyService._pairs.get(steam_id, {}).items()
+                if counter[0] >= minimum
+            ]
+        duos.sort(key=lambda d: (d['win_rate'], d['matches']), reverse=True)
+        return duos
+
+    @staticmethod
+    def get_ranking(min_matches: Optional[int] = None) -> List[Dict]:
+        '''
+        Retorna todas as duplas do servidor, da maior para a menor taxa de vitória.
+        '''
+        minimum = SynergyService.MIN_MATCHES if min_matches is None else min_matches
+        with SynergyService._lock:
+            ranking = [
+                SynergyService._entry(first, second, counter)
+                for first, partners in SynergyService._pairs.items()
+                for second, counter in partners.items()
+                if first < second and counter[0] >= minimum
+            ]
+        ranking.sort(key=lambda d: (d['win_rate'], d['matches']), reverse=True)
+        return ranking
+
+    @staticmethod
+    def pair_count() -> int:
+        with SynergyService._lock:
+            return sum(len(partners) for partners in SynergyService._pairs.values()) // 2
@@ -1,47 +1,43 @@
-import json
-import os
 import logging
+from typing import Dict, FrozenSet, Optional
+from services.storage_service import StorageService
 
 logger = logging.getLogger(__name__)
 
 class UserService:
     '''
     Serviço responsável pelo gerenciamento de usuários e seus IDs da Steam.
+
+    Os usuários são carregados do armazenamento uma única vez e mantidos em
+    memória com índices nos dois sentidos (Discord -> Steam e Steam -> Discord).
+    Alterações são gravadas imediatamente (write-through).
     '''
-    
-    DATA_FILE = 'data/users.json'
+
+    TABLE = 'users'
+
+    _users: Optional[Dict[str, str]] = None
+    _steam_to_discord: Dict[str, str] = {}
+    # Cópia imutável dos Steam IDs, refeita a cada alteração: lida também em threads
+    _registered: FrozenSet[str] = frozenset()
 
     @staticmethod
-    def _load_users() -> dict:
+    def _registry() -> Dict[str, str]:
         '''
-        Carrega os usuários do arquivo JSON.
-
-        Returns:
-            dict: Dicionário mapeando Discord ID para Steam ID.
+        Retorna o registro em memória, carregando-o na primeira chamada.
         '''
-        if not os.path.exists(UserService.DATA_FILE):
-            return {}
-        
-        try:
-            with open(UserService.DATA_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Erro ao carregar usuários: {e}")
-            return {}
+        if UserService._users is None:
+            UserService.reload()
+        return UserService._users
 
     @staticmethod
-    def _save_users(users: dict):
+    def reload():
         '''
-        Salva o dicionário de usuários no arquivo JSON.
-
-        Args:
-            users (dict): Os dados a serem salvos.
+        Recarrega o registro a partir do armazenamento e reconstrói os índices.
         '''
-        try:
-            with open(UserService.DATA_FILE, 'w') as f:
-                json.dump(users, f, indent=4)
-        except Exception as e:
-            logger.error(f"Erro ao salvar usuários: {e}")
+        users = {str(k): v for k, v in StorageService.get_backend().load(UserService.TABLE).items()}
+        UserService._users = users
+        UserService._steam_to_discord = {steam_id: discord_id for discord_id, steam_id in users.items()}
+        UserService._registered = frozenset(UserService._steam_to_discord)
 
     @staticmethod
     def register_user(discord_id: str, steam_id: str):
@@ -52,9 +48,19 @@ class UserService:
             discord_id (str): ID do usuário no Discord.
             steam_id (str): Steam ID 64 do usuário.
         '''
-        users = UserService._load_users()
-        users[str(discord_id)] = steam_id
-        UserService._save_users(users)
+        users = UserService._registry()
+        discord_id = str(discord_id)
+
+        # Grava antes de alterar os índices: uma falha de escrita não deixa um cadastro só em memória
+        StorageService.get_backend().upsert_many(UserService.TABLE, {discord_id: steam_id})
+
+        previous = users.get(discord_id)
+        if previous and UserService._steam_to_discord.get(previous) == discord_id:
+            del UserService._steam_to_discord[previous]
+
+        users[discord_id] = steam_id
+        UserService._steam_to_discord[steam_id] = discord_id
+        UserService._registered = frozenset(UserService._steam_to_discord)
         logger.info(f"Usuário {discord_id} vinculado ao Steam ID {steam_id}")
 
     @staticmethod
@@ -68,5 +74,47 @@ class UserService:
         Returns:
             str: O Steam ID vinculado ou None se não encontrado.
         '''
-        users = UserService._load_users()
-        return users.get(str(discord_id))
+        return UserService._registry().get(str(discord_id))
+
+    @staticmethod
+    def get_discord_id(steam_id: str) -> Optional[str]:
+        '''
+        Recupera o usuário do Discord vinculado a um Steam ID.
+
+        Args:
+            steam_id (str): Steam ID 64 do jogador.
+
+        Returns:
+            str: O Discord ID ou None se o Steam ID não estiver cadastrado.
+        '''
+        UserService._registry()
+        return UserService._steam_to_discord.get(steam_id)
+
+    @staticmethod
+    def get_all_users() -> Dict[str, str]:
+        '''
+        Retorna uma cópia de todos os cadastros.
+
+        Returns:
+            dict: Dicionário mapeando Discord ID para Steam ID.
+        '''
+        return dict(UserService._registry())
+
+    @staticmethod
+    def get_registered_steam_ids() -> FrozenSet[str]:
+        '''
+        Retorna o conjunto de Steam IDs cadastrados (consulta O(1) por ID).
+
+        Returns:
+            frozenset: Cópia imutável, segura para uso em outras threads.
+        '''
+        UserService._registry()
+        return UserService._registered
+
+    @staticmethod
+    def is_registered_steam_id(steam_id: str) -> bool:
+        '''
+        Verifica se um Steam ID pertence a algum usuário cadastrado.
+        '''
+        UserService._registry()
+        return steam_id in UserService._steam_to_discord
@@ -0,0 +1,460 @@
+'''
+Servidor local que imita a API pública do Leetify, para testes offline e de carga.
+
+Endpoints: /v3/profile, /v3/profile/matches e /v2/matches/{id}.
+
+Uso:
+    # Servidor com 1000 jogadores sintéticos, 80ms de latência e 2% de erros 500
+    python -m tools.leetify_mock_server serve --players 1000 --latency-ms 80 --error-rate 0.02
+
+    # Aponta o bot para o servidor local
+    LEETIFY_BASE_URL=http://127.0.0.1:8765 python index.py
+
+    # Grava fixtures a partir da API real (requer LEETIFY_TOKEN) e as reproduz depois
+    python -m tools.leetify_mock_server record --steam-ids 7656119... --out fixtures/
+    python -m tools.leetify_mock_server serve --fixtures fixtures/
+
+    # Benchmark de polling contra o servidor local, sem rede
+    python -m tools.leetify_mock_server bench --players 5000 --concurrency 50
+'''
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+MAPS = ['de_mirage', 'de_inferno', 'de_nuke', 'de_ancient', 'de_anubis', 'de_dust2', 'de_vertigo', 'de_train']
+STEAM_ID_BASE = 76561198000000000
+
+class SyntheticWorld:
+    '''
+    Gera jogadores e partidas de forma determinística a partir de uma seed.
+
+    Cada partida guarda apenas seus jogadores e a seed; o payload completo é
+    montado sob demanda, mantendo a memória baixa mesmo com 10k jogadores.
+    '''
+
+    def __init__(self, players: int, matches_per_player: int, seed: int = 42):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.steam_ids = [str(STEAM_ID_BASE + i) for i in range(players)]
+        self.history: Dict[str, deque] = {sid: deque(maxlen=matches_per_player) for sid in self.steam_ids}
+        self.versions: Dict[str, int] = {sid: 0 for sid in self.steam_ids}
+        self.matches: Dict[str, tuple] = {}
+        self._next_match = 0
+        self._clock = time.time() - matches_per_player * 3600
+
+        for _ in range(matches_per_player):
+            players_pool = list(self.steam_ids)
+            self.rng.shuffle(players_pool)
+            for start in range(0, len(players_pool) - 9, 10):
+                self._create_match(players_pool[start:start + 10])
+            self._clock += 3600
+
+    def _create_match(self, lobby: List[str]) -> str:
+        match_id = f"mock-{self._next_match:010d}"
+        self._next_match += 1
+        self.matches[match_id] = (self.rng.getrandbits(32), tuple(lobby), self._clock)
+        for sid in lobby:
+            self.history[sid].appendleft(match_id)
+            self.versions[sid] += 1
+        return match_id
+
+    def simulate_activity(self, lobbies: int):
+        '''
+        Cria novas partidas para jogadores aleatórios (simula atividade entre polls).
+        '''
+        self._clock = max(self._clock, time.time())
+        for _ in range(lobbies):
+            if len(self.steam_ids) < 10:
+                return
+            self._create_match(self.rng.sample(self.steam_ids, 10))
+
+    def match_payload(self, match_id: str) -> Optional[dict]:
+        entry = self.matches.get(match_id)
+        if not entry:
+            return None
+
+        match_seed, lobby, finished_at = entry
+        rng = random.Random(match_seed)
+        rounds_t2 = rng.randint(3, 13)
+        rounds_t3 = 13 if rounds_t2 < 13 else rng.randint(3, 12)
+        if rng.random() < 0.5:
+            rounds_t2, rounds_t3 = rounds_t3, rounds_t2
+        winner = 2 if rounds_t2 > rounds_t3 else 3
+        total_rounds = rounds_t2 + rounds_t3
+
+        stats = []
+        for idx, sid in enumerate(lobby):
+            kills = rng.randint(3, 35)
+            deaths = rng.randint(5, 25)
+            damage = kills * rng.randint(80, 120)
+            rating = round(rng.uniform(-0.08, 0.08), 4)
+            stats.append({
+                'steam64_id': sid,
+                'name': f"player_{int(sid) - STEAM_ID_BASE}",
+                'initial_team_number': 2 if idx < 5 else 3,
+                'total_kills': kills,
+                'total_deaths': deaths,
+                'kd_ratio': round(kills / deaths, 2),
+                'total_hs_kills': rng.randint(0, kills),
+                'total_damage': damage,
+                'dpr': round(damage / total_rounds, 1),
+                'mvps': rng.randint(0, 6),
+                'leetify_rating': rating,
+                'ct_leetify_rating': round(rating + rng.uniform(-0.03, 0.03), 4),
+                't_leetify_rating': round(rating + rng.uniform(-0.03, 0.03), 4)
+            })
+
+        finished = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(finished_at))
+        return {
+            'id': match_id,
+            'map_name': MAPS[match_seed % len(MAPS)],
+            'finished_at': finished,
+            'game_finished_at': finished,
+            'data_source': 'matchmaking',
+            'has_banned_player': rng.random() < 0.03,
+            'replay_url': None,
+            'winner_team_number': winner,
+            'team_scores': [
+                {'team_number': 2, 'score': rounds_t2},
+                {'team_number': 3, 'score': rounds_t3}
+            ],
+            'stats': stats
+        }
+
+    def matches_payload(self, steam_id: str) -> Optional[list]:
+        if steam_id not in self.history:
+            return None
+        return [self.match_payload(mid) for mid in self.history[steam_id]]
+
+    def profile_payload(self, steam_id: str) -> Optional[dict]:
+        if steam_id not in self.history:
+            return None
+
+        rng = random.Random(f"{self.seed}-{steam_id}")
+        teammates: Dict[str, int] = {}
+        for mid in self.history[steam_id]:
+            _, lobby, _ = self.matches[mid]
+            team = lobby[:5] if steam_id in lobby[:5] else lobby[5:]
+            for sid in team:
+                if sid != steam_id:
+                    teammates[sid] = teammates.get(sid, 0) + 1
+
+        recent = sorted(teammates.items(), key=lambda x: x[1], reverse=True)[:5]
+        return {
+            'steam64_id': steam_id,
+            'name': f"player_{int(steam_id) - STEAM_ID_BASE}",
+            'total_matches': rng.randint(100, 3000),
+            'winrate': round(rng.uniform(0.4, 0.6), 3),
+            'ranks': {
+                'premier': rng.randint(5000, 25000),
+                'leetify': round(rng.uniform(-3, 3), 2),
+                'competitive': [{'map_name': m, 'rank': rng.randint(1, 18)} for m in MAPS[:4]]
+            },
+            'stats': {
+                'accuracy_head': round(rng.uniform(10, 35), 1),
+                'preaim': round(rng.uniform(6, 15), 1)
+            },
+            'recent_teammates': [{'steam64_id': sid, 'recent_matches_count': c} for sid, c in recent]
+        }
+
+class MockLeetifyServer:
+    '''
+    Aplicação aiohttp que serve fixtures gravadas ou dados sintéticos,
+    com latência e erros (429/500) injetáveis.
+    '''
+
+    def __init__(self, world: Optional[SyntheticWorld], fixtures_dir: Optional[str] = None,
+                 latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: int = 1):
+        self.world = world
+        self.fixtures_dir = fixtures_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rng = random.Random()
+        self.counters = {'requests': 0, '200': 0, '304': 0, '404': 0, '429': 0, '500': 0}
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/v3/profile', self.handle_profile)
+        app.router.add_get('/v3/profile/matches', self.handle_matches)
+        app.router.add_get('/v2/matches/{match_id}', self.handle_match)
+        app.router.add_get('/_mock/stats', self.handle_stats)
+        return app
+
+    def _load_fixture(self, kind: str, key: str):
+        if not self.fixtures_dir:
+            return None
+        path = os.path.join(self.fixtures_dir, kind, f"{os.path.basename(key)}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    async def _simulate_network(self) -> Optional[web.Response]:
+        self.counters['requests'] += 1
+        if self.latency_ms or self.jitter_ms:
+            delay = self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+            await asyncio.sleep(max(0.0, delay) / 1000)
+
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            self.counters['429'] += 1
+            return web.json_response({'error': 'rate limited'}, status=429,
+                                     headers={'Retry-After': str(self.retry_after)})
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.counters['500'] += 1
+            return web.json_response({'error': 'internal error'}, status=500)
+        return None
+
+    def _respond(self, request: web.Request, build_payload: Callable[[], object],
+                 version_key: Optional[str] = None) -> web.Response:
+        '''
+        Responde com o payload, ou 304 se o ETag enviado ainda for válido.
+
+        Com version_key o ETag é conhecido sem montar o payload.
+        '''
+        etag = f'"{hashlib.md5(version_key.encode()).hexdigest()}"' if version_key else None
+        if etag and request.headers.get('If-None-Match') == etag:
+            self.counters['304'] += 1
+            return web.Response(status=304, headers={'ETag': etag})
+
+        payload = build_payload()
+        if payload is None:
+            self.counters['404'] += 1
+            return web.json_response({'error': 'not found'}, status=404)
+
+        body = json.dumps(payload, separators=(',', ':'))
+        if not etag:
+            etag = f'"{hashlib.md5(body.encode()).hexdigest()}"'
+            if request.headers.get('If-None-Match') == etag:
+                self.counters['304'] += 1
+                return web.Response(status=304, headers={'ETag': etag})
+
+        self.counters['200'] += 1
+        return web.Response(text=body, content_type='application/json', headers={'ETag': etag})
+
+    def _version_key(self, kind: str, steam_id: str) -> Optional[str]:
+        if self.world and steam_id in self.world.versions:
+            return f"{kind}:{steam_id}:{self.world.versions[steam_id]}"
+        return None
+
+    async def handle_profile(self, request: web.Request) -> web.Response:
+        error = await self._simulate_network()
+        if error:
+            return error
+        steam_id = request.query.get('steam64_id', '')
+        fixture = self._load_fixture('profile', steam_id)
+        if fixture is not None or not self.world:
+            return self._respond(request, lambda: fixture)
+        return self._respond(request, lambda: self.world.profile_payload(steam_id),
+                             self._version_key('profile', steam_id))
+
+    async def handle_matches(self, request: web.Request) -> web.Response:
+        error = await self._simulate_network()
+        if error:
+            return error
+        steam_id = request.query.get('steam64_id', '')
+        fixture = self._load_fixture('matches', steam_id)
+        if fixture is not None or not self.world:
+            return self._respond(request, lambda: fixture)
+        return self._respond(request, lambda: self.world.matches_payload(steam_id),
+                             self._version_key('matches', steam_id))
+
+    async def handle_match(self, request: web.Request) -> web.Response:
+        error = await self._simulate_network()
+        if error:
+            return error
+        match_id = request.match_info['match_id']
+        fixture = self._load_fixture('match', match_id)
+        if fixture is not None or not self.world:
+            return self._respond(request, lambda: fixture)
+        return self._respond(request, lambda: self.world.match_payload(match_id))
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.counters)
+
+async def start_server(server: MockLeetifyServer, host: str, port: int) -> web.AppRunner:
+    '''
+    Inicia o servidor em background no event loop atual.
+    '''
+    runner = web.AppRunner(server.build_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner
+
+async def activity_loop(world: SyntheticWorld, lobbies: int, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        world.simulate_activity(lobbies)
+
+def build_server(args) -> MockLeetifyServer:
+    world = SyntheticWorld(args.players, args.matches_per_player, args.seed) if args.players else None
+    return MockLeetifyServer(
+        world, args.fixtures,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after
+    )
+
+async def serve(args):
+    server = build_server(args)
+    runner = await start_server(server, args.host, args.port)
+    logger.info(f"Mock do Leetify em http://{args.host}:{args.port} "
+                f"({args.players} jogadores sintéticos, fixtures: {args.fixtures or '-'})")
+    try:
+        if server.world and args.activity_lobbies:
+            await activity_loop(server.world, args.activity_lobbies, args.activity_interval)
+        else:
+            await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+def isolate_local_data(directory: str):
+    '''
+    Aponta o histórico e o armazenamento de partidas para um diretório temporário,
+    para que record e bench não gravem em data/ do bot.
+    '''
+    from services.match_history_service import MatchHistoryService
+    from services.match_store_service import MatchStoreService
+
+    MatchHistoryService.HISTORY_FILE = os.path.join(directory, 'history', 'matches.jsonl')
+    MatchHistoryService.OWNERS_FILE = os.path.join(directory, 'history', 'players.txt')
+    MatchStoreService.DATA_DIR = os.path.join(directory, 'matches')
+    MatchStoreService.INDEX_FILE = os.path.join(directory, 'matches', 'index.jsonl')
+
+async def record(args):
+    '''
+    Grava respostas reais da API no formato de fixtures aceito por --fixtures.
+    '''
+    from services.json_service import JsonService
+    from services.leetify_service import LeetifyService
+
+    data_dir = tempfile.TemporaryDirectory(prefix='leetify-record-')
+    isolate_local_data(data_dir.name)
+
+    for kind in ('profile', 'matches', 'match'):
+        os.makedirs(os.path.join(args.out, kind), exist_ok=True)
+
+    def write(kind: str, key: str, payload):
+        # As partidas chegam projetadas (Match); convertidas antes de abrir o arquivo
+        payload = JsonService.loads(JsonService.dumps(payload))
+        with open(os.path.join(args.out, kind, f"{key}.json"), 'w') as f:
+            json.dump(payload, f, indent=4)
+
+    try:
+        for steam_id in args.steam_ids:
+            profile = await LeetifyService.get_user_profile(steam_id)
+            matches = await LeetifyService.get_recent_matches(steam_id)
+            if profile:
+                write('profile', steam_id, profile)
+            if matches:
+                write('matches', steam_id, matches)
+            for match in matches[:args.match_details]:
+                details = await LeetifyService.get_match_details(match.get('id'))
+                if details:
+                    write('match', match.get('id'), details)
+            logger.info(f"Fixtures gravadas para {steam_id}: {len(matches)} partidas")
+    finally:
+        await LeetifyService.close()
+        data_dir.cleanup()
+
+async def bench(args):
+    '''
+    Mede o tempo de um ciclo de polling de todos os jogadores sintéticos.
+    '''
+    os.environ.setdefault('LEETIFY_TOKEN', 'mock')
+    from services.leetify_service import LeetifyService
+    from services.rate_limit_service import Priority, TokenBucketLimiter
+
+    data_dir = tempfile.TemporaryDirectory(prefix='leetify-bench-')
+    isolate_local_data(data_dir.name)
+
+    server = build_server(args)
+    runner = await start_server(server, args.host, args.port)
+    LeetifyService.BASE_URL = f"http://{args.host}:{args.port}"
+    LeetifyService.rate_limiter = TokenBucketLimiter(rate=args.rate, capacity=max(1, int(args.rate)))
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def poll(steam_id: str):
+        async with semaphore:
+            return await LeetifyService.poll_recent_matches(steam_id, Priority.BACKGROUND)
+
+    try:
+        for cycle in range(args.cycles):
+            before = dict(server.counters)
+            start = time.perf_counter()
+            results = await asyncio.gather(*(poll(sid) for sid in server.world.steam_ids))
+            elapsed = time.perf_counter() - start
+            changed = sum(1 for _, c in results if c)
+            requests = server.counters['requests'] - before['requests']
+            print(
+                f"ciclo {cycle + 1}: {len(results)} jogadores em {elapsed:.2f}s "
+                f"({requests / elapsed:.0f} req/s) | alterados: {changed} | "
+                f"304: {server.counters['304'] - before['304']} | "
+                f"erros: {server.counters['500'] - before['500'] + server.counters['429'] - before['429']}"
+            )
+            server.world.simulate_activity(args.activity_lobbies)
+    finally:
+        await LeetifyService.close()
+        await runner.cleanup()
+        data_dir.cleanup()
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='[ %(asctime)s ] %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Servidor mock da API do Leetify")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def add_server_args(p, default_players):
+        p.add_argument('--host', default='127.0.0.1')
+        p.add_argument('--port', type=int, default=8765)
+        p.add_argument('--players', type=int, default=default_players, help="Jogadores sintéticos (0 desativa)")
+        p.add_argument('--matches-per-player', type=int, default=20)
+        p.add_argument('--seed', type=int, default=42)
+        p.add_argument('--fixtures', help="Diretório de fixtures gravadas (têm prioridade)")
+        p.add_argument('--latency-ms', type=float, default=0)
+        p.add_argument('--jitter-ms', type=float, default=0)
+        p.add_argument('--error-rate', type=float, default=0.0, help="Fração de respostas 500")
+        p.add_argument('--rate-limit-rate', type=float, default=0.0, help="Fração de respostas 429")
+        p.add_argument('--retry-after', type=int, default=1)
+        p.add_argument('--activity-lobbies', type=int, default=0, help="Partidas novas por intervalo/ciclo")
+
+    p_serve = sub.add_parser('serve', help="Inicia o servidor")
+    add_server_args(p_serve, 100)
+    p_serve.add_argument('--activity-interval', type=float, default=60.0)
+
+    p_bench = sub.add_parser('bench', help="Benchmark de polling contra o servidor local")
+    add_server_args(p_bench, 1000)
+    p_bench.add_argument('--concurrency', type=int, default=20)
+    p_bench.add_argument('--rate', type=float, default=1000.0, help="Limite do token bucket (req/s)")
+    p_bench.add_argument('--cycles', type=int, default=2)
+
+    p_record = sub.add_parser('record', help="Grava fixtures a partir da API real")
+    p_record.add_argument('--steam-ids', nargs='+', required=True)
+    p_record.add_argument('--out', required=True)
+    p_record.add_argument('--match-details', type=int, default=5, help="Detalhes gravados por jogador")
+
+    args = parser.parse_args()
+    handler = {'serve': serve, 'bench': bench, 'record': record}[args.command]
+    try:
+        asyncio.run(handler(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from dotenv import load_dotenv
+
+# Antes de importar os serviços: as configurações são lidas do ambiente na importação
+load_dotenv()
+
+from services.config_service import ConfigService
+from services.leetify_service import LeetifyService
+from services.match_tracker_service import MatchTrackerService
+from services.poll_scheduler_service import PollSchedulerService
+from services.poller_service import PollerService
+from services.shard_service import ShardService
+from services.storage_service import StorageService
+from services.user_service import UserService
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='[ %(asctime)s ] {%(filename)s:%(lineno)d} %(levelname)s - %(message)s',
+    datefmt='%d-%m-%Y %H:%M:%S',
+    handlers=[
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+async def heartbeat_loop(worker_id: str):
+    '''
+    Mantém o heartbeat do worker, independente da duração dos ciclos.
+    '''
+    while True:
+        try:
+            await asyncio.to_thread(ShardService.heartbeat, worker_id)
+        except Exception as e:
+            logger.error(f"Erro ao gravar heartbeat: {e}")
+        await asyncio.sleep(ShardService.HEARTBEAT_INTERVAL)
+
+async def main():
+    '''
+    Processo de polling: verifica as partidas da sua fatia dos usuários e grava
+    as notificações na outbox compartilhada, entregue pelo bot (index.py com
+    POLLER_MODE=workers).
+
+    Vários workers podem rodar ao mesmo tempo, sempre na mesma máquina do
+    bot: o SQLite (WAL) e o histórico de partidas são arquivos locais e não
+    podem ser compartilhados por sistema de arquivos de rede. O limite de
+    requisições do Leetify é dividido igualmente entre os workers e o bot, e o
+    orçamento de polling entre os workers.
+    '''
+    if StorageService.BACKEND != 'sqlite':
+        logger.error("worker.py requer STORAGE_BACKEND=sqlite (armazenamento compartilhado).")
+        return
+
+    worker_id = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    # Aquecimento de cache não serve para o bot, que roda em outro processo
+    PollerService.PREFETCH = False
+
+    foreign = ShardService.foreign_hosts(worker_id)
+    if foreign:
+        logger.error(f"Há workers ativos em outro host ({', '.join(foreign)}); bot e workers devem rodar na mesma máquina.")
+        return
+
+    logger.info(f"Iniciando worker {worker_id}...")
+    ShardService.heartbeat(worker_id)
+    heartbeat = asyncio.ensure_future(heartbeat_loop(worker_id))
+    owned_ids = set()
+
+    try:
+        while True:
+            try:
+                # Cadastros e configuração podem mudar pelo bot a qualquer momento
+                UserService.reload()
+                owned = ShardService.owned_users(worker_id, UserService.get_all_users())
+                workers = ShardService.worker_count(worker_id)
+                LeetifyService.set_rate_share(1 / (workers + 1))
+                PollSchedulerService.set_share(1 / workers)
+
+                # Usuários recebidos de outro worker: relê o estado gravado por ele
+                gained = set(owned) - owned_ids
+                if gained:
+                    MatchTrackerService.reload(gained)
+                if set(owned) != owned_ids:
+                    logger.info(f"Worker {worker_id} responsável por {len(owned)} usuários")
+                owned_ids = set(owned)
+
+                channel_id = ConfigService.get_notification_channel()
+                if channel_id:
+                    await PollerService.run_cycle(channel_id, owned)
+            except Exception as e:
+                logger.error(f"Erro no ciclo do worker: {e}")
+
+            await asyncio.sleep(PollerService.POLL_TICK)
+    finally:
+        heartbeat.cancel()
+        ShardService.leave(worker_id)
+        await LeetifyService.close()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # ignore exit
+        pass